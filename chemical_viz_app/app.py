@@ -10,7 +10,7 @@ from src.data.models import ChemicalNetwork
 from src.visualization.network import NetworkVisualizer
 from src.visualization.filters import NetworkFilter
 from src.ui.components import UIComponents
-from src.ui.sidebar import SidebarControls
+from src.ui.sidebar import get_sidebar_controls
 from src.ui.resizable_columns import ResizableColumns
 from src.utils.annotation_manager import AnnotationManager
 from src.data.annotation_processor import AnnotationProcessor
@@ -39,7 +39,7 @@ def initialize_session_state():
             'edge_label_column': 'type'
         }
     if 'column_ratio' not in st.session_state:
-        st.session_state.column_ratio = [3, 1]  # Default 3:1 ratio for main columns
+        st.session_state.column_ratio = [3, 3]  # Default main column width 3 of 6 units
     if 'show_modifinder_viz' not in st.session_state:
         st.session_state.show_modifinder_viz = False
     
@@ -47,6 +47,13 @@ def initialize_session_state():
     AnnotationManager.initialize_session_state()
 
 
+def _select_element(node_id=None, edge_id=None):
+    """Button callback: select a node or an edge, clearing the other selection."""
+    st.session_state.selected_node_id = node_id
+    st.session_state.selected_edge_id = edge_id
+    st.session_state.show_modifinder_viz = False  # Reset ModiFinder visualization
+
+
 def render_node_click_buttons(network: ChemicalNetwork):
     """Render invisible buttons for each node to handle clicks."""
     if not network or not network.nodes:
@@ -62,17 +69,15 @@ def render_node_click_buttons(network: ChemicalNetwork):
             with button_cols[col_idx]:
                 # Create button with zero height and hidden text
                 button_key = f"node_click_{node.id}"
-                if st.button(
+                st.button(
                     f"Select {node.id}", 
                     key=button_key,
                     help=f"Click to select node {node.label}",
                     type="secondary",
-                    use_container_width=True
-                ):
-                    st.session_state.selected_node_id = node.id
-                    st.session_state.selected_edge_id = None  # Clear edge selection
-                    st.session_state.show_modifinder_viz = False  # Reset ModiFinder visualization
-                    st.rerun()
+                    use_container_width=True,
+                    on_click=_select_element,
+                    kwargs={'node_id': node.id}
+                )
 
 
 def render_edge_click_buttons(network: ChemicalNetwork):
@@ -92,17 +97,15 @@ def render_edge_click_buttons(network: ChemicalNetwork):
                 edge_id = f"{edge.source}-{edge.target}-{i}"
                 display_id = f"{edge.source}-{edge.target}"
                 button_key = f"edge_click_{edge_id}"
-                if st.button(
+                st.button(
                     f"Select {display_id}", 
                     key=button_key,
                     help=f"Click to select edge {edge.source} → {edge.target} (#{i})",
                     type="secondary",
-                    use_container_width=True
-                ):
-                    st.session_state.selected_edge_id = edge_id
-                    st.session_state.selected_node_id = None  # Clear node selection
-                    st.session_state.show_modifinder_viz = False  # Reset ModiFinder visualization
-                    st.rerun()
+                    use_container_width=True,
+                    on_click=_select_element,
+                    kwargs={'edge_id': edge_id}
+                )
 
 
 def load_network_data(upload_data):
@@ -164,8 +167,7 @@ def load_network_data(upload_data):
                 print(f"DEBUG: Applied {applied_annotations - original_annotations} user annotations to network")
                 
                 # MISSING STEP 2: Generate ModiFinder links for annotated nodes
-                from .src.data.annotation_processor import AnnotationProcessor
-                processor = AnnotationProcessor()
+                processor = AnnotationProcessor.get_session_processor()
                 modifinder_results = processor.generate_modifinder_links_for_existing_annotations(network)
                 print(f"DEBUG: Generated {modifinder_results['links_created']} ModiFinder links for annotated nodes")
                 
@@ -242,6 +244,14 @@ def main():
     
     upload_data = UIComponents.render_data_upload()
     
+    # A file left in the uploader comes back on every rerun; only load it again when it changes
+    upload_key = None
+    if isinstance(upload_data, tuple) and upload_data[0] == "graphml":
+        graphml_file = upload_data[1]
+        upload_key = getattr(graphml_file, 'file_id', None) or (graphml_file.name, graphml_file.size)
+        if st.session_state.network and st.session_state.get('_loaded_upload') == upload_key:
+            upload_data = None
+    
     if upload_data:
         network = load_network_data(upload_data)
         if network:
@@ -249,7 +259,13 @@ def main():
             if is_valid:
                 st.session_state.network = network
                 st.session_state.filtered_network = network
-                
+                st.session_state._loaded_upload = upload_key
+
+                # Node IDs may repeat across files, so drop memoized panel data
+                st.session_state.pop('_panel_cache', None)
+                st.session_state.pop('_edge_html_cache', None)
+                st.session_state.pop('_network_html', None)
+
                 # Load existing annotations
                 annotation_manager = AnnotationManager()
                 annotation_manager.load_annotations_from_file()
@@ -263,7 +279,7 @@ def main():
         annotation_manager = AnnotationManager()
         st.session_state.network = annotation_manager.apply_annotations_to_network(st.session_state.network)
         
-        sidebar_controls = SidebarControls()
+        sidebar_controls = get_sidebar_controls()
         
         # Add column width control
         column_ratio = sidebar_controls.render_column_width_control()
@@ -363,9 +379,9 @@ def main():
         st.markdown("""
         <div class="content-section">
             <h2>Network Visualization</h2>
-            <div style="background: #e3f2fd; border: 1px solid #2196f3; border-radius: 4px; padding: 0.75rem; margin: 0.5rem 0;">
+            <div class="interaction-guide">
                 <strong>Interaction Guide:</strong>
-                <ul style="margin: 0.5rem 0; padding-left: 1.5rem;">
+                <ul>
                     <li>Click nodes to view detailed molecular information</li>
                     <!-- <li>Click edges to see spectrum alignments and molecular formulas</li> -->
                     <li>Drag nodes to rearrange the network layout</li>
@@ -376,36 +392,61 @@ def main():
         
         visualizer = NetworkVisualizer()
         
-        # Use default node coloring (library_SMILES-based green/grey implemented in NetworkVisualizer)
-        node_colors = None
-        node_sizes = None
-        edge_colors = None
-        
-        if sizing_options.get('size_by') == 'Property':
-            prop = sizing_options.get('size_property')
-            if prop:
-                node_sizes = visualizer.get_node_sizes_by_property(
-                    st.session_state.filtered_network,
-                    prop,
-                    sizing_options.get('min_size', 10),
-                    sizing_options.get('max_size', 50)
-                )
-        
-        # Use default edge coloring (type-based from config)
-        
-        html_file = visualizer.visualize_network(
-            st.session_state.filtered_network,
-            height=st.session_state.visualization_settings.get('height', '750px'),
-            physics=st.session_state.visualization_settings.get('physics', True),
-            node_colors=node_colors,
-            node_sizes=node_sizes,
-            edge_colors=edge_colors,
-            node_label_column=st.session_state.labeling_settings.get('node_label_column', 'label'),
-            show_edge_labels=st.session_state.labeling_settings.get('edge_labels_enabled', False),
-            edge_label_column=st.session_state.labeling_settings.get('edge_label_column', 'type')
+        # Generating the pyvis HTML is the slowest part of a rerun; reuse it while the base
+        # network and every option that shapes the drawing are unchanged
+        base_network = st.session_state.network
+        viz_settings = st.session_state.visualization_settings
+        labeling_settings = st.session_state.labeling_settings
+        viz_key = (
+            base_network.revision,
+            len(base_network.nodes),
+            len(base_network.edges),
+            library_smiles_filter,
+            tuple(molecular_networking_filters.items()),
+            tuple(sizing_options.items()),
+            viz_settings.get('height', '750px'),
+            viz_settings.get('physics', True),
+            labeling_settings.get('node_label_column', 'label'),
+            labeling_settings.get('edge_labels_enabled', False),
+            labeling_settings.get('edge_label_column', 'type')
         )
+        cached_html = st.session_state.get('_network_html')
+        
+        if cached_html and cached_html[0] == viz_key:
+            html_content = cached_html[1]
+        else:
+            # Use default node coloring (library_SMILES-based green/grey implemented in NetworkVisualizer)
+            node_colors = None
+            node_sizes = None
+            edge_colors = None
+            
+            if sizing_options.get('size_by') == 'Property':
+                prop = sizing_options.get('size_property')
+                if prop:
+                    node_sizes = visualizer.get_node_sizes_by_property(
+                        st.session_state.filtered_network,
+                        prop,
+                        sizing_options.get('min_size', 10),
+                        sizing_options.get('max_size', 50)
+                    )
+            
+            # Use default edge coloring (type-based from config)
+            
+            html_file = visualizer.visualize_network(
+                st.session_state.filtered_network,
+                height=st.session_state.visualization_settings.get('height', '750px'),
+                physics=st.session_state.visualization_settings.get('physics', True),
+                node_colors=node_colors,
+                node_sizes=node_sizes,
+                edge_colors=edge_colors,
+                node_label_column=st.session_state.labeling_settings.get('node_label_column', 'label'),
+                show_edge_labels=st.session_state.labeling_settings.get('edge_labels_enabled', False),
+                edge_label_column=st.session_state.labeling_settings.get('edge_label_column', 'type')
+            )
+            html_content = visualizer.build_streamlit_html(html_file)
+            st.session_state._network_html = (viz_key, html_content)
         
-        visualizer.display_in_streamlit(html_file)
+        visualizer.display_html(html_content)
         
         # Render hidden buttons for node and edge clicking (below visualization)
         with st.expander("Selection Interface", expanded=False):
@@ -569,7 +610,7 @@ def main():
         
         # SMILES Annotation Processing Panel
         st.markdown("---")
-        annotation_processor = AnnotationProcessor()
+        annotation_processor = AnnotationProcessor.get_session_processor()
         annotation_processor.render_pending_updates_panel()
         
         # Network Statistics with improved styling
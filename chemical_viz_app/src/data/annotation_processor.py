@@ -25,6 +25,21 @@ class AnnotationProcessor:
         self.annotation_manager = AnnotationManager()
         self.link_generator = ModiFinderLinkGenerator()
     
+    @classmethod
+    def get_session_processor(cls) -> 'AnnotationProcessor':
+        """
+        Get the AnnotationProcessor for the current session, creating it once.
+        
+        The processor's annotation manager tracks the user's current project
+        file, so instances are shared per session rather than process-wide.
+        
+        Returns:
+            The session's AnnotationProcessor instance
+        """
+        if '_annotation_processor' not in st.session_state:
+            st.session_state._annotation_processor = cls()
+        return st.session_state._annotation_processor
+    
     def process_pending_annotations(self, network: ChemicalNetwork) -> Tuple[ChemicalNetwork, Dict[str, Any]]:
         """
         Process all pending SMILES annotations and update the network.
@@ -218,6 +233,9 @@ class AnnotationProcessor:
                 error_msg = f"Edge {edge.source}-{edge.target}: {str(e)}"
                 results['errors'].append(error_msg)
         
+        if results['count']:
+            network.invalidate_summaries()
+        
         # Print summary
         print(f"DEBUG: ModiFinder link generation summary:")
         print(f"  ✅ Links created: {results['count']}")
@@ -275,6 +293,7 @@ class AnnotationProcessor:
                 # Set blue color for annotated nodes
                 node.color = "#2196F3"  # Blue color
                 node.properties['visual_annotation_marker'] = True
+        network.invalidate_summaries()
     
     def get_pending_updates_summary(self) -> Dict[str, Any]:
         """
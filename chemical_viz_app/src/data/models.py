@@ -1,6 +1,7 @@
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, Union
+from typing import Callable, Dict, FrozenSet, List, Optional, Any, Tuple, Union
 from enum import Enum
+import numbers
 import pandas as pd
 
 
@@ -31,6 +32,12 @@ class ChemicalNode:
     size: Optional[float] = None
     color: Optional[str] = None
     
+    # Property keys written by the SMILES annotation workflow
+    ANNOTATION_KEYS = (
+        'library_SMILES', 'annotation_status', 'annotation_timestamp', 'annotation_metadata',
+        'visual_annotation_marker'
+    )
+    
     def to_dict(self) -> Dict[str, Any]:
         return {
             "id": self.id,
@@ -131,6 +138,15 @@ class ChemicalNetwork:
     nodes: List[ChemicalNode] = field(default_factory=list)
     edges: List[ChemicalEdge] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Lazily built id -> node lookup, rebuilt when the node list grows
+    _node_index: Dict[str, ChemicalNode] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _node_index_size: int = field(default=-1, init=False, repr=False, compare=False)
+    # Derived summaries (property key sets, SMILES matches), dropped when nodes/edges are added
+    # or properties are edited in place (see invalidate_summaries)
+    _summaries: Dict[str, Any] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _summaries_size: Tuple[int, int] = field(default=(-1, -1), init=False, repr=False, compare=False)
+    # Bumped on every in-place property edit, for callers caching work derived from the network
+    revision: int = field(default=0, init=False, repr=False, compare=False)
     
     def add_node(self, node: ChemicalNode) -> None:
         self.nodes.append(node)
@@ -139,10 +155,66 @@ class ChemicalNetwork:
         self.edges.append(edge)
     
     def get_node_by_id(self, node_id: str) -> Optional[ChemicalNode]:
-        for node in self.nodes:
-            if node.id == node_id:
-                return node
-        return None
+        if self._node_index_size != len(self.nodes):
+            # First occurrence wins, matching the previous linear scan
+            self._node_index = {}
+            for node in self.nodes:
+                self._node_index.setdefault(node.id, node)
+            self._node_index_size = len(self.nodes)
+        return self._node_index.get(node_id)
+    
+    def _summary(self, name: str, compute: Callable[[], Any]) -> Any:
+        sizes = (len(self.nodes), len(self.edges))
+        if sizes != self._summaries_size:
+            self._summaries.clear()
+            self._summaries_size = sizes
+        if name not in self._summaries:
+            self._summaries[name] = compute()
+        return self._summaries[name]
+    
+    def invalidate_summaries(self) -> None:
+        """Drop cached summaries after node or edge properties were edited in place."""
+        self._summaries.clear()
+        self.revision += 1
+    
+    def get_node_property_keys(self) -> FrozenSet[str]:
+        """Property keys present on at least one node."""
+        return self._summary('node_keys', lambda: frozenset().union(*(node.properties for node in self.nodes)))
+    
+    def get_edge_property_keys(self) -> FrozenSet[str]:
+        """Property keys present on at least one edge."""
+        return self._summary('edge_keys', lambda: frozenset().union(*(edge.properties for edge in self.edges)))
+    
+    def get_numeric_node_properties(self) -> FrozenSet[str]:
+        """Node property keys with at least one value that converts to float."""
+        def compute():
+            numeric = set()
+            for node in self.nodes:
+                for prop, value in node.properties.items():
+                    if prop in numeric:
+                        continue
+                    if isinstance(value, numbers.Real):
+                        numeric.add(prop)
+                        continue
+                    try:
+                        float(value)
+                        numeric.add(prop)
+                    except (TypeError, ValueError):
+                        pass
+            return frozenset(numeric)
+        return self._summary('numeric_node_keys', compute)
+    
+    def get_library_smiles_node_ids(self, letters: Tuple[str, ...]) -> FrozenSet[str]:
+        """IDs of nodes whose library_SMILES contains any of the given letters."""
+        def compute():
+            node_ids = set()
+            for node in self.nodes:
+                if "library_SMILES" in node.properties:
+                    smiles = str(node.properties["library_SMILES"])
+                    if any(letter in smiles for letter in letters):
+                        node_ids.add(node.id)
+            return frozenset(node_ids)
+        return self._summary('library_smiles_with_' + ''.join(letters), compute)
     
     def get_edge_by_id(self, edge_id: str) -> Optional[ChemicalEdge]:
         """Get edge by ID in format 'source-target-index'."""
@@ -228,5 +300,6 @@ class ChemicalNetwork:
         if node:
             node.properties['library_SMILES'] = smiles
             node.set_annotation_status('user_annotated', timestamp)
+            self.invalidate_summaries()
             return True
         return False
\ No newline at end of file
@@ -1,21 +1,683 @@
 import streamlit as st
 import streamlit.components.v1 as components
-from typing import Dict, Any, List, Optional, TYPE_CHECKING
+from typing import Callable, Dict, Any, List, Optional, TYPE_CHECKING
 import pandas as pd
+import functools
+import html
+import json
+import os
 import re
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
 from ..data.models import ChemicalNetwork
+from ..data.annotation_processor import AnnotationProcessor
+from ..utils.annotation_manager import AnnotationManager
+from ..utils.modifinder_utils import ModiFinderUtils
 
 if TYPE_CHECKING:
     from ..data.models import ChemicalNode, ChemicalEdge
 
 
+# Developer diagnostics in the annotation panel, enabled with VIZ_DEBUG=1
+_DEBUG = os.environ.get('VIZ_DEBUG') == '1'
+
+# SMILES validation tables (built once, used on every preview keystroke)
+_SMILES_INVALID_RE = re.compile(r'[^A-Za-z0-9()\[\]{}=#+\-.@/\\]')
+_SMILES_BRACKET_RE = re.compile(r'[()\[\]{}]')
+_SMILES_BRACKETS = {'(': ')', '[': ']', '{': '}'}
+_SMILES_CLOSERS = frozenset(_SMILES_BRACKETS.values())
+
+# Node detail panel: property display names (as requested by user) and categories
+FIELD_MAPPINGS = {
+    'library_SMILES': 'SMILES',
+    'library_compound_name': 'Compound Name',
+    'library_InChI': 'InChI',
+    'rt': 'Retention Time',
+    'mz': 'Precursor Mass',
+    'library_classfire_superclass': 'ClassyFire Superclass',
+    'library_classyfire_class': 'ClassyFire Class',
+    'library_classyfire_subclass': 'ClassyFire Subclass',
+    'library_npclassifier_superclass': 'npclassifier Super Class',
+    'library_npclassifier_class': 'npclassifier Class',
+    'library_npclassifier_pathway': 'npclassifier Pathway',
+    'SpectrumID': 'Spectrum ID',
+    'Compound_Name': 'Compound Name',
+    'Adduct': 'Adduct',
+    'molecular_formula': 'Molecular Formula'
+}
+STRUCTURAL_KEYS = frozenset({'library_SMILES', 'library_InChI', 'molecular_formula'})
+ANALYTICAL_KEYS = frozenset({'rt', 'mz', 'SpectrumID', 'Adduct'})
+CHEMICAL_DATA_KEYS = frozenset({'library_SMILES', 'library_InChI'})
+SPECTRUM_FIELDS = ('spectrum_id', 'SpectrumID', 'usi', 'USI')
+_FIELD_ORDER = {key: index for index, key in enumerate(FIELD_MAPPINGS)}
+
+# Value patterns that get the chemical-data styling in the detail panels
+_CHEM_DATA_RE = re.compile(r'[=+\-()\[\]@]|smiles|inchi', re.I)
+_IDENTIFIER_DATA_RE = re.compile(r'http|gnps|usi', re.I)
+
+# Characters replaced in column names for Arrow compatibility
+_COLUMN_NAME_SPECIAL_RE = re.compile(r'[#@$%^&*()+=[\]{}|\\:";\'<>?/~`]')
+
+# Property row templates
+_PROPERTY_ITEM_HTML = """
+<div class="property-item">
+    <strong>{name}:</strong> {value}
+</div>
+"""
+_CHEMICAL_PROPERTY_ITEM_HTML = """
+<div class="property-item">
+    <strong>{name}:</strong>
+    <div class="chemical-data">{value}</div>
+</div>
+"""
+_BEST_MATCH_HTML = """
+<div class="property-item best-match">
+    <strong>Best Match:</strong> <code>{formula}</code><br>
+    <small>Error: {error_da:.4f} Da ({error_ppm:.1f} ppm)</small>
+</div>
+"""
+_FORMULA_CANDIDATE_HTML = (
+    '<div class="formula-candidate {rank_class}">'
+    '<div><strong>{rank}. {formula}</strong></div>'
+    '<div class="formula-candidate-error">'
+    '<div>{error_da:.4f} Da</div>'
+    '<div>{error_ppm:.1f} ppm</div>'
+    '</div>'
+    '</div>'
+)
+# ModiFinder viewer document for components.html; styles are inline because page CSS
+# doesn't reach into the component iframe
+_MODIFINDER_FRAME_HTML = (
+    '<div style="width: 100%; height: 800px; box-sizing: border-box; border: 2px solid #e0e0e0; '
+    'border-radius: 8px; overflow: hidden; box-shadow: 0 2px 4px rgba(0,0,0,0.1); background-color: white;">'
+    '<iframe src="{url}" style="width: 100%; height: 100%; border: none;" width="100%" height="800" '
+    'frameborder="0" loading="lazy" referrerpolicy="no-referrer-when-downgrade" fetchpriority="low" '
+    'allow="clipboard-write"></iframe>'
+    '</div>'
+)
+# Unindented so markdown's dedent doesn't turn the panel into a code block
+_CONNECTED_NODE_HTML = (
+    '<div class="detail-panel">'
+    '<h4>{role}: {label}</h4>'
+    '<div class="property-item"><strong>ID:</strong> <code>{node_id}</code></div>'
+    '<div class="property-item"><strong>Type:</strong> <span class="type-badge">{node_type}</span></div>'
+    '{compound_row}'
+    '</div>'
+)
+
+
+# App-wide stylesheet emitted by render_header on every run
+_HEADER_CSS = """
+<style>
+/* Force white background on everything */
+.stApp {
+    background-color: white !important;
+}
+.main .block-container {
+    background-color: white !important;
+    padding-top: 2rem;
+    max-width: 100%;
+}
+
+/* Improved typography hierarchy */
+.main h1 {
+    font-size: 2.5rem;
+    font-weight: 600;
+    color: #1e3a5f !important;
+    margin-bottom: 0.5rem;
+}
+.main h2 {
+    font-size: 1.8rem;
+    font-weight: 500;
+    color: #2c5aa0 !important;
+    margin-top: 2rem;
+    margin-bottom: 1rem;
+    border-bottom: 2px solid #e9ecef;
+    padding-bottom: 0.5rem;
+}
+.main h3 {
+    font-size: 1.3rem;
+    font-weight: 500;
+    color: #495057 !important;
+    margin-top: 1.5rem;
+    margin-bottom: 0.75rem;
+}
+.main h4 {
+    font-size: 1.1rem;
+    font-weight: 500;
+    color: #6c757d !important;
+    margin-top: 1rem;
+    margin-bottom: 0.5rem;
+}
+
+/* Enhanced section styling */
+.content-section {
+    background: white;
+    border: 1px solid #e9ecef;
+    border-radius: 8px;
+    padding: 1.5rem;
+    margin: 1rem 0;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+}
+
+.detail-panel {
+    background: #f8f9fa;
+    border: 1px solid #dee2e6;
+    border-radius: 8px;
+    padding: 1.5rem;
+    margin: 0.5rem 0;
+}
+
+.property-item {
+    background: white;
+    border: 1px solid #e9ecef;
+    border-radius: 4px;
+    padding: 0.75rem;
+    margin: 0.5rem 0;
+    border-left: 4px solid #007bff;
+}
+
+.chemical-data {
+    background: #f1f3f4;
+    border: 1px solid #dadce0;
+    border-radius: 4px;
+    padding: 0.5rem;
+    font-family: 'Courier New', monospace;
+    font-size: 0.9rem;
+    word-break: break-all;
+}
+
+/* Detail panel badges and metadata rows */
+.detail-meta {
+    display: flex;
+    gap: 2rem;
+    margin-bottom: 1rem;
+}
+
+.type-badge,
+.edge-type-badge {
+    background: #e3f2fd;
+    padding: 0.25rem 0.5rem;
+    border-radius: 4px;
+    font-size: 0.9rem;
+}
+
+.edge-type-badge {
+    background: #fff3cd;
+}
+
+.property-item.best-match {
+    border-left: 4px solid #28a745;
+}
+
+/* Formula candidate list */
+.formula-candidates {
+    background: #f8f9fa;
+    padding: 1rem;
+    border-radius: 4px;
+    margin: 0.5rem 0;
+}
+
+.formula-candidate {
+    background: white;
+    border: 1px solid #dee2e6;
+    border-left: 4px solid #6c757d;
+    border-radius: 4px;
+    padding: 0.75rem;
+    margin: 0.5rem 0;
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+}
+
+.formula-candidate.rank-best {
+    border-left-color: #28a745;
+}
+
+.formula-candidate.rank-top {
+    border-left-color: #ffc107;
+}
+
+.formula-candidate-error {
+    text-align: right;
+    font-size: 0.9rem;
+    color: #6c757d;
+}
+
+/* Interaction guide callout */
+.interaction-guide {
+    background: #e3f2fd;
+    border: 1px solid #2196f3;
+    border-radius: 4px;
+    padding: 0.75rem;
+    margin: 0.5rem 0;
+}
+
+.interaction-guide ul {
+    margin: 0.5rem 0;
+    padding-left: 1.5rem;
+}
+
+/* Override Streamlit's default dark backgrounds */
+.stApp > div {
+    background-color: white !important;
+}
+[data-testid="stAppViewContainer"] {
+    background-color: white !important;
+}
+[data-testid="stHeader"] {
+    background-color: white !important;
+}
+[data-testid="stToolbar"] {
+    background-color: white !important;
+}
+
+/* Sidebar styling - white background */
+.sidebar .sidebar-content {
+    background-color: white !important;
+    border-right: 2px solid #e9ecef;
+}
+.sidebar .sidebar-header {
+    background-color: white !important;
+}
+[data-testid="stSidebar"] {
+    background-color: white !important;
+}
+[data-testid="stSidebar"] > div {
+    background-color: white !important;
+}
+
+/* File upload styling - white background */
+.stFileUploader {
+    background-color: white !important;
+    border: 2px dashed #dee2e6;
+    border-radius: 8px;
+    padding: 1rem;
+    margin: 0.5rem 0;
+}
+.stFileUploader:hover {
+    border-color: #007bff;
+    background-color: #f8f9ff !important;
+}
+.stFileUploader > div {
+    background-color: white !important;
+}
+.stFileUploader > div > div {
+    background-color: white !important;
+}
+.stFileUploader * {
+    background-color: white !important;
+    color: black !important;
+}
+[data-testid="stFileUploader"] {
+    background-color: white !important;
+}
+[data-testid="stFileUploader"] > div {
+    background-color: white !important;
+}
+[data-testid="stFileUploader"] * {
+    background-color: white !important;
+    color: black !important;
+}
+
+/* Dropdown/selectbox styling - white background */
+.stSelectbox {
+    background-color: white !important;
+}
+.stSelectbox > div {
+    background-color: white !important;
+}
+.stSelectbox > div > div {
+    background-color: white !important;
+    border: 1px solid #ced4da;
+    border-radius: 4px;
+    color: black !important;
+}
+.stSelectbox > div > div > div {
+    background-color: white !important;
+    color: black !important;
+}
+.stSelectbox > div > div:focus-within {
+    border-color: #007bff;
+    box-shadow: 0 0 0 0.2rem rgba(0, 123, 255, 0.25);
+}
+.stSelectbox * {
+    background-color: white !important;
+    color: black !important;
+}
+[data-testid="stSelectbox"] {
+    background-color: white !important;
+}
+[data-testid="stSelectbox"] > div {
+    background-color: white !important;
+}
+[data-testid="stSelectbox"] * {
+    background-color: white !important;
+    color: black !important;
+}
+
+/* Additional dropdown menu styling */
+.stSelectbox [role="listbox"] {
+    background-color: white !important;
+    border: 1px solid #ced4da;
+}
+.stSelectbox [role="option"] {
+    background-color: white !important;
+    color: black !important;
+}
+.stSelectbox [role="option"]:hover {
+    background-color: #f8f9fa !important;
+    color: black !important;
+}
+
+/* Target the dropdown overlay and options more specifically */
+div[data-baseweb="select"] {
+    background-color: white !important;
+}
+div[data-baseweb="select"] > div {
+    background-color: white !important;
+    color: black !important;
+}
+div[data-baseweb="select"] * {
+    background-color: white !important;
+    color: black !important;
+}
+div[data-baseweb="popover"] {
+    background-color: white !important;
+}
+div[data-baseweb="popover"] > div {
+    background-color: white !important;
+    color: black !important;
+}
+div[data-baseweb="popover"] * {
+    background-color: white !important;
+    color: black !important;
+}
+
+/* More specific dropdown menu targeting */
+.css-1wa3eu0-placeholder {
+    color: black !important;
+}
+.css-1uccc91-singleValue {
+    color: black !important;
+}
+.css-26l3qy-menu {
+    background-color: white !important;
+}
+.css-4ljt47-MenuList {
+    background-color: white !important;
+}
+.css-1n7v3ny-option {
+    background-color: white !important;
+    color: black !important;
+}
+
+/* Comprehensive dropdown menu styling - catch all variations */
+[class*="css-"][class*="menu"] {
+    background-color: white !important;
+}
+[class*="css-"][class*="option"] {
+    background-color: white !important;
+    color: black !important;
+}
+[class*="css-"][class*="MenuList"] {
+    background-color: white !important;
+}
+
+/* Target any div that looks like a dropdown menu */
+div[role="listbox"],
+div[role="menu"],
+div[role="combobox"],
+ul[role="listbox"],
+ul[role="menu"] {
+    background-color: white !important;
+    color: black !important;
+}
+
+div[role="listbox"] *,
+div[role="menu"] *,
+div[role="combobox"] *,
+ul[role="listbox"] *,
+ul[role="menu"] * {
+    background-color: white !important;
+    color: black !important;
+}
+
+/* Catch any element with option role */
+[role="option"] {
+    background-color: white !important;
+    color: black !important;
+}
+[role="option"]:hover,
+[role="option"]:focus {
+    background-color: #f8f9fa !important;
+    color: black !important;
+}
+
+/* Nuclear option - target any element inside stSelectbox */
+.stSelectbox div,
+.stSelectbox span,
+.stSelectbox ul,
+.stSelectbox li {
+    background-color: white !important;
+    color: black !important;
+}
+
+/* Radio button styling - white background */
+.stRadio > div {
+    background-color: white !important;
+    padding: 0.5rem;
+    border-radius: 4px;
+    border: 1px solid #e9ecef;
+}
+[data-testid="stRadio"] {
+    background-color: white !important;
+}
+
+/* Expander styling - white background */
+.streamlit-expanderHeader {
+    background-color: white !important;
+    border: 1px solid #dee2e6;
+    border-radius: 4px;
+    padding: 0.5rem 1rem;
+    color: black !important;
+}
+.streamlit-expanderHeader:hover {
+    background-color: #f8f9fa !important;
+}
+.streamlit-expanderContent {
+    background-color: white !important;
+    border: 1px solid #dee2e6;
+    border-top: none;
+    border-radius: 0 0 4px 4px;
+    padding: 1rem;
+}
+[data-testid="stExpander"] {
+    background-color: white !important;
+}
+
+/* Button styling - keep colorful buttons but ensure text is readable */
+.stButton > button {
+    background-color: #007bff;
+    color: white;
+    border: none;
+    border-radius: 4px;
+    padding: 0.375rem 0.75rem;
+    font-weight: 500;
+}
+.stButton > button:hover {
+    background-color: #0056b3;
+    transform: translateY(-1px);
+    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+}
+
+/* Secondary button styling */
+.stButton > button[kind="secondary"] {
+    background-color: white !important;
+    color: black !important;
+    border: 1px solid #ced4da;
+}
+.stButton > button[kind="secondary"]:hover {
+    background-color: #f8f9fa !important;
+    color: black !important;
+}
+
+/* Ensure all containers have white background */
+.stContainer, .stColumns {
+    background-color: white !important;
+}
+
+/* Override any dark text and make it black */
+.stApp, .stApp *, div, span, p, h1, h2, h3, h4, h5, h6 {
+    color: black !important;
+}
+
+/* Metrics styling - white background */
+[data-testid="metric-container"] {
+    background-color: white !important;
+    padding: 1rem;
+    border-radius: 4px;
+    border: 1px solid #e9ecef;
+    margin: 0.5rem 0;
+}
+
+/* DataFrame styling - white background */
+.stDataFrame {
+    background-color: white !important;
+    border: 1px solid #dee2e6;
+    border-radius: 4px;
+}
+[data-testid="stDataFrame"] {
+    background-color: white !important;
+}
+
+/* Tab styling - white background */
+.stTabs {
+    background-color: white !important;
+}
+.stTabs > div {
+    background-color: white !important;
+}
+.stTabs > div > div {
+    background-color: white !important;
+}
+.stTabs > div > div > div {
+    background-color: white !important;
+    color: black !important;
+}
+.stTabs > div > div > div[data-baseweb="tab-highlight"] {
+    background-color: #007bff !important;
+    color: white !important;
+}
+
+/* Info/warning/error boxes - white background */
+.stAlert {
+    background-color: white !important;
+    border: 1px solid #dee2e6;
+    color: black !important;
+}
+[data-testid="stAlert"] {
+    background-color: white !important;
+    color: black !important;
+}
+
+/* Code blocks - grey background */
+.stCode {
+    background-color: #e9ecef !important;
+    border: 1px solid #ced4da;
+    color: black !important;
+}
+pre, code {
+    background-color: #e9ecef !important;
+    color: black !important;
+    padding: 0.5rem;
+    border-radius: 4px;
+}
+
+/* Spinner - ensure it's visible */
+.stSpinner {
+    color: #007bff !important;
+}
+
+/* Input fields - white background */
+.stTextInput > div > div > input {
+    background-color: white !important;
+    color: black !important;
+    border: 1px solid #ced4da;
+}
+
+/* Markdown content - ensure black text */
+.stMarkdown {
+    color: black !important;
+}
+.stMarkdown * {
+    color: black !important;
+}
+
+/* Success/info messages - white background */
+.stSuccess {
+    background-color: white !important;
+    border: 1px solid #28a745;
+    color: black !important;
+}
+.stInfo {
+    background-color: white !important;
+    border: 1px solid #17a2b8;
+    color: black !important;
+}
+.stWarning {
+    background-color: white !important;
+    border: 1px solid #ffc107;
+    color: black !important;
+}
+.stError {
+    background-color: white !important;
+    border: 1px solid #dc3545;
+    color: black !important;
+}
+</style>
+"""
+
+
+def _render_html(fragment: str):
+    """Render a pure-HTML fragment in the page, skipping the markdown parser where supported."""
+    if hasattr(st, 'html'):
+        st.html(fragment)
+    else:
+        st.markdown(fragment, unsafe_allow_html=True)
+
+
+# Partial reruns need Streamlit >= 1.33; older releases render as a plain function
+_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
+
+def _set_session_state(key: str, value: Any):
+    """Button callback: update session state before the rerun the click triggers."""
+    st.session_state[key] = value
+
+
+def _truncate(text: str, limit: int = 50) -> str:
+    """Shorten text to limit characters, adding an ellipsis only when it was cut."""
+    if len(text) <= limit:
+        return text
+    return text[:limit] + '...'
+
+
+@functools.lru_cache(maxsize=256)
+def _pretty(key: str) -> str:
+    """Display form of a property key, e.g. 'precursor_mz' -> 'Precursor Mz'."""
+    return key.replace('_', ' ').title()
+
+
 class UIComponents:
     
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def _sanitize_column_name(col_name: str) -> str:
         """Sanitize column names for Arrow compatibility."""
         # Replace special characters that cause issues
-        sanitized = re.sub(r'[#@$%^&*()+=[\]{}|\\:";\'<>?/~`]', '_', str(col_name))
+        sanitized = _COLUMN_NAME_SPECIAL_RE.sub('_', str(col_name))
         # Remove leading/trailing underscores and spaces
         sanitized = sanitized.strip('_').strip()
         # Ensure it's not empty
@@ -23,34 +685,44 @@ class UIComponents:
             sanitized = "column"
         return sanitized
     
+    @staticmethod
+    def _build_table_columns(items: List[Any], columns: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
+        """Add one column per sanitized property key to the fixed columns of a node/edge table."""
+        row_count = len(items)
+        key_map = {}
+        for row, item in enumerate(items):
+            for key, value in item.properties.items():
+                sanitized_key = key_map.get(key)
+                if sanitized_key is None:
+                    sanitized_key = key_map[key] = UIComponents._sanitize_column_name(key)
+                column = columns.get(sanitized_key)
+                if column is None:
+                    # Rows without this property show as missing, like the DataFrame constructor does
+                    column = columns[sanitized_key] = [float('nan')] * row_count
+                column[row] = value
+        return columns
+    
     @staticmethod
     def _normalize_dataframe_types(df: pd.DataFrame) -> pd.DataFrame:
         """Normalize DataFrame column types for Arrow compatibility."""
-        df_copy = df.copy()
+        new_cols = {}
         
-        for col in df_copy.columns:
-            # Check if column has mixed types
-            column_data = df_copy[col]
-            unique_types = set(type(x).__name__ for x in column_data.dropna())
+        for col in df.columns:
+            column_data = df[col]
+            # Native numeric/bool columns are already Arrow-friendly
+            if column_data.dtype != object:
+                continue
             
-            # If we have mixed types or problematic types, convert to string
-            if len(unique_types) > 1 or any(t in ['float', 'int'] for t in unique_types):
-                # Check if any values are actually numeric types mixed with strings
-                has_numeric = any(isinstance(x, (int, float)) for x in column_data.dropna())
-                has_string = any(isinstance(x, str) for x in column_data.dropna())
-                
-                if has_numeric and has_string:
-                    # Mixed numeric and string - convert all to string
-                    df_copy[col] = column_data.astype(str).replace('nan', '')
-                elif has_numeric:
-                    # All numeric but might have NaN - ensure consistent numeric type
-                    try:
-                        # Try to keep as float if possible
-                        df_copy[col] = pd.to_numeric(column_data, errors='coerce')
-                    except:
-                        df_copy[col] = column_data.astype(str).replace('nan', '')
-        
-        return df_copy
+            # Let pandas classify the values in C instead of scanning them in Python
+            kind = pd.api.types.infer_dtype(column_data, skipna=True)
+            if kind in ('mixed', 'mixed-integer'):
+                # Mixed numeric and string - convert all to string
+                new_cols[col] = column_data.astype(str).replace('nan', '')
+            elif kind in ('integer', 'floating', 'mixed-integer-float', 'decimal'):
+                # All numeric but stored as objects - ensure consistent numeric type
+                new_cols[col] = pd.to_numeric(column_data, errors='coerce')
+        
+        return df.assign(**new_cols) if new_cols else df
     
     @staticmethod
     def render_header():
@@ -62,468 +734,80 @@ class UIComponents:
         )
         
         # Add custom CSS for white background and improved styling
-        st.markdown("""
-        <style>
-        /* Force white background on everything */
-        .stApp {
-            background-color: white !important;
-        }
-        .main .block-container {
-            background-color: white !important;
-            padding-top: 2rem;
-            max-width: 100%;
-        }
-        
-        /* Improved typography hierarchy */
-        .main h1 {
-            font-size: 2.5rem;
-            font-weight: 600;
-            color: #1e3a5f !important;
-            margin-bottom: 0.5rem;
-        }
-        .main h2 {
-            font-size: 1.8rem;
-            font-weight: 500;
-            color: #2c5aa0 !important;
-            margin-top: 2rem;
-            margin-bottom: 1rem;
-            border-bottom: 2px solid #e9ecef;
-            padding-bottom: 0.5rem;
-        }
-        .main h3 {
-            font-size: 1.3rem;
-            font-weight: 500;
-            color: #495057 !important;
-            margin-top: 1.5rem;
-            margin-bottom: 0.75rem;
-        }
-        .main h4 {
-            font-size: 1.1rem;
-            font-weight: 500;
-            color: #6c757d !important;
-            margin-top: 1rem;
-            margin-bottom: 0.5rem;
-        }
-        
-        /* Enhanced section styling */
-        .content-section {
-            background: white;
-            border: 1px solid #e9ecef;
-            border-radius: 8px;
-            padding: 1.5rem;
-            margin: 1rem 0;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-        }
-        
-        .detail-panel {
-            background: #f8f9fa;
-            border: 1px solid #dee2e6;
-            border-radius: 8px;
-            padding: 1.5rem;
-            margin: 0.5rem 0;
-        }
-        
-        .property-item {
-            background: white;
-            border: 1px solid #e9ecef;
-            border-radius: 4px;
-            padding: 0.75rem;
-            margin: 0.5rem 0;
-            border-left: 4px solid #007bff;
-        }
-        
-        .chemical-data {
-            background: #f1f3f4;
-            border: 1px solid #dadce0;
-            border-radius: 4px;
-            padding: 0.5rem;
-            font-family: 'Courier New', monospace;
-            font-size: 0.9rem;
-            word-break: break-all;
-        }
-        
-        /* Override Streamlit's default dark backgrounds */
-        .stApp > div {
-            background-color: white !important;
-        }
-        [data-testid="stAppViewContainer"] {
-            background-color: white !important;
-        }
-        [data-testid="stHeader"] {
-            background-color: white !important;
-        }
-        [data-testid="stToolbar"] {
-            background-color: white !important;
-        }
-        
-        /* Sidebar styling - white background */
-        .sidebar .sidebar-content {
-            background-color: white !important;
-            border-right: 2px solid #e9ecef;
-        }
-        .sidebar .sidebar-header {
-            background-color: white !important;
-        }
-        [data-testid="stSidebar"] {
-            background-color: white !important;
-        }
-        [data-testid="stSidebar"] > div {
-            background-color: white !important;
-        }
+        st.markdown(_HEADER_CSS, unsafe_allow_html=True)
         
-        /* File upload styling - white background */
-        .stFileUploader {
-            background-color: white !important;
-            border: 2px dashed #dee2e6;
-            border-radius: 8px;
-            padding: 1rem;
-            margin: 0.5rem 0;
-        }
-        .stFileUploader:hover {
-            border-color: #007bff;
-            background-color: #f8f9ff !important;
-        }
-        .stFileUploader > div {
-            background-color: white !important;
-        }
-        .stFileUploader > div > div {
-            background-color: white !important;
-        }
-        .stFileUploader * {
-            background-color: white !important;
-            color: black !important;
-        }
-        [data-testid="stFileUploader"] {
-            background-color: white !important;
-        }
-        [data-testid="stFileUploader"] > div {
-            background-color: white !important;
-        }
-        [data-testid="stFileUploader"] * {
-            background-color: white !important;
-            color: black !important;
-        }
-        
-        /* Dropdown/selectbox styling - white background */
-        .stSelectbox {
-            background-color: white !important;
-        }
-        .stSelectbox > div {
-            background-color: white !important;
-        }
-        .stSelectbox > div > div {
-            background-color: white !important;
-            border: 1px solid #ced4da;
-            border-radius: 4px;
-            color: black !important;
-        }
-        .stSelectbox > div > div > div {
-            background-color: white !important;
-            color: black !important;
-        }
-        .stSelectbox > div > div:focus-within {
-            border-color: #007bff;
-            box-shadow: 0 0 0 0.2rem rgba(0, 123, 255, 0.25);
-        }
-        .stSelectbox * {
-            background-color: white !important;
-            color: black !important;
-        }
-        [data-testid="stSelectbox"] {
-            background-color: white !important;
-        }
-        [data-testid="stSelectbox"] > div {
-            background-color: white !important;
-        }
-        [data-testid="stSelectbox"] * {
-            background-color: white !important;
-            color: black !important;
-        }
-        
-        /* Additional dropdown menu styling */
-        .stSelectbox [role="listbox"] {
-            background-color: white !important;
-            border: 1px solid #ced4da;
-        }
-        .stSelectbox [role="option"] {
-            background-color: white !important;
-            color: black !important;
-        }
-        .stSelectbox [role="option"]:hover {
-            background-color: #f8f9fa !important;
-            color: black !important;
-        }
-        
-        /* Target the dropdown overlay and options more specifically */
-        div[data-baseweb="select"] {
-            background-color: white !important;
-        }
-        div[data-baseweb="select"] > div {
-            background-color: white !important;
-            color: black !important;
-        }
-        div[data-baseweb="select"] * {
-            background-color: white !important;
-            color: black !important;
-        }
-        div[data-baseweb="popover"] {
-            background-color: white !important;
-        }
-        div[data-baseweb="popover"] > div {
-            background-color: white !important;
-            color: black !important;
-        }
-        div[data-baseweb="popover"] * {
-            background-color: white !important;
-            color: black !important;
-        }
-        
-        /* More specific dropdown menu targeting */
-        .css-1wa3eu0-placeholder {
-            color: black !important;
-        }
-        .css-1uccc91-singleValue {
-            color: black !important;
-        }
-        .css-26l3qy-menu {
-            background-color: white !important;
-        }
-        .css-4ljt47-MenuList {
-            background-color: white !important;
-        }
-        .css-1n7v3ny-option {
-            background-color: white !important;
-            color: black !important;
-        }
-        
-        /* Comprehensive dropdown menu styling - catch all variations */
-        [class*="css-"][class*="menu"] {
-            background-color: white !important;
-        }
-        [class*="css-"][class*="option"] {
-            background-color: white !important;
-            color: black !important;
-        }
-        [class*="css-"][class*="MenuList"] {
-            background-color: white !important;
-        }
-        
-        /* Target any div that looks like a dropdown menu */
-        div[role="listbox"],
-        div[role="menu"],
-        div[role="combobox"],
-        ul[role="listbox"],
-        ul[role="menu"] {
-            background-color: white !important;
-            color: black !important;
-        }
-        
-        div[role="listbox"] *,
-        div[role="menu"] *,
-        div[role="combobox"] *,
-        ul[role="listbox"] *,
-        ul[role="menu"] * {
-            background-color: white !important;
-            color: black !important;
-        }
-        
-        /* Catch any element with option role */
-        [role="option"] {
-            background-color: white !important;
-            color: black !important;
-        }
-        [role="option"]:hover,
-        [role="option"]:focus {
-            background-color: #f8f9fa !important;
-            color: black !important;
-        }
-        
-        /* Nuclear option - target any element inside stSelectbox */
-        .stSelectbox div,
-        .stSelectbox span,
-        .stSelectbox ul,
-        .stSelectbox li {
-            background-color: white !important;
-            color: black !important;
-        }
-        
-        /* Radio button styling - white background */
-        .stRadio > div {
-            background-color: white !important;
-            padding: 0.5rem;
-            border-radius: 4px;
-            border: 1px solid #e9ecef;
-        }
-        [data-testid="stRadio"] {
-            background-color: white !important;
-        }
-        
-        /* Expander styling - white background */
-        .streamlit-expanderHeader {
-            background-color: white !important;
-            border: 1px solid #dee2e6;
-            border-radius: 4px;
-            padding: 0.5rem 1rem;
-            color: black !important;
-        }
-        .streamlit-expanderHeader:hover {
-            background-color: #f8f9fa !important;
-        }
-        .streamlit-expanderContent {
-            background-color: white !important;
-            border: 1px solid #dee2e6;
-            border-top: none;
-            border-radius: 0 0 4px 4px;
-            padding: 1rem;
-        }
-        [data-testid="stExpander"] {
-            background-color: white !important;
-        }
-        
-        /* Button styling - keep colorful buttons but ensure text is readable */
-        .stButton > button {
-            background-color: #007bff;
-            color: white;
-            border: none;
-            border-radius: 4px;
-            padding: 0.375rem 0.75rem;
-            font-weight: 500;
-        }
-        .stButton > button:hover {
-            background-color: #0056b3;
-            transform: translateY(-1px);
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }
-        
-        /* Secondary button styling */
-        .stButton > button[kind="secondary"] {
-            background-color: white !important;
-            color: black !important;
-            border: 1px solid #ced4da;
-        }
-        .stButton > button[kind="secondary"]:hover {
-            background-color: #f8f9fa !important;
-            color: black !important;
-        }
-        
-        /* Ensure all containers have white background */
-        .stContainer, .stColumns {
-            background-color: white !important;
-        }
-        
-        /* Override any dark text and make it black */
-        .stApp, .stApp *, div, span, p, h1, h2, h3, h4, h5, h6 {
-            color: black !important;
-        }
-        
-        /* Metrics styling - white background */
-        [data-testid="metric-container"] {
-            background-color: white !important;
-            padding: 1rem;
-            border-radius: 4px;
-            border: 1px solid #e9ecef;
-            margin: 0.5rem 0;
-        }
-        
-        /* DataFrame styling - white background */
-        .stDataFrame {
-            background-color: white !important;
-            border: 1px solid #dee2e6;
-            border-radius: 4px;
-        }
-        [data-testid="stDataFrame"] {
-            background-color: white !important;
-        }
-        
-        /* Tab styling - white background */
-        .stTabs {
-            background-color: white !important;
-        }
-        .stTabs > div {
-            background-color: white !important;
-        }
-        .stTabs > div > div {
-            background-color: white !important;
-        }
-        .stTabs > div > div > div {
-            background-color: white !important;
-            color: black !important;
-        }
-        .stTabs > div > div > div[data-baseweb="tab-highlight"] {
-            background-color: #007bff !important;
-            color: white !important;
-        }
-        
-        /* Info/warning/error boxes - white background */
-        .stAlert {
-            background-color: white !important;
-            border: 1px solid #dee2e6;
-            color: black !important;
-        }
-        [data-testid="stAlert"] {
-            background-color: white !important;
-            color: black !important;
-        }
+        st.title("Chemical Data Network Visualization")
+        st.markdown("---")
+    
+    @staticmethod
+    def _render_graphml_upload():
+        """Render the GraphML uploader; returns ("graphml", file) once a file is chosen."""
+        st.markdown("""
+        <div class="detail-panel">
+            <p><strong>GraphML Format:</strong> Preserves all node and edge attributes</p>
+            <p>Compatible with Cytoscape, Gephi, yEd, and other network analysis tools</p>
+            <p><em>Drag and drop your .graphml file below or click to browse</em></p>
+        </div>
+        """, unsafe_allow_html=True)
         
-        /* Code blocks - grey background */
-        .stCode {
-            background-color: #e9ecef !important;
-            border: 1px solid #ced4da;
-            color: black !important;
-        }
-        pre, code {
-            background-color: #e9ecef !important;
-            color: black !important;
-            padding: 0.5rem;
-            border-radius: 4px;
-        }
+        graphml_file = st.file_uploader(
+            "Select GraphML file",
+            type=['graphml', 'xml'],
+            key="network_graphml",
+            help="GraphML files preserve all node and edge attributes from tools like Cytoscape, Gephi, or yEd"
+        )
         
-        /* Spinner - ensure it's visible */
-        .stSpinner {
-            color: #007bff !important;
-        }
+        if graphml_file:
+            return ("graphml", graphml_file)
+        return None
+    
+    @staticmethod
+    def _render_project_upload():
+        """Render the saved-project picker; returns ("project", filename) when loaded."""
+        st.markdown("""
+        <div class="detail-panel">
+            <p><strong>Previous Projects:</strong> Load your saved work with annotations</p>
+            <p>Select from previously worked on GraphML files with your SMILES annotations</p>
+        </div>
+        """, unsafe_allow_html=True)
         
-        /* Input fields - white background */
-        .stTextInput > div > div > input {
-            background-color: white !important;
-            color: black !important;
-            border: 1px solid #ced4da;
-        }
+        annotation_manager = AnnotationManager()
         
-        /* Markdown content - ensure black text */
-        .stMarkdown {
-            color: black !important;
-        }
-        .stMarkdown * {
-            color: black !important;
-        }
+        # Get available projects
+        projects = annotation_manager.get_available_projects()
         
-        /* Success/info messages - white background */
-        .stSuccess {
-            background-color: white !important;
-            border: 1px solid #28a745;
-            color: black !important;
-        }
-        .stInfo {
-            background-color: white !important;
-            border: 1px solid #17a2b8;
-            color: black !important;
-        }
-        .stWarning {
-            background-color: white !important;
-            border: 1px solid #ffc107;
-            color: black !important;
-        }
-        .stError {
-            background-color: white !important;
-            border: 1px solid #dc3545;
-            color: black !important;
-        }
-        </style>
+        if not projects:
+            st.info("No previous projects found. Upload a GraphML file and annotate some nodes to create your first project.")
+        else:
+            # Create options for dropdown
+            project_options = {}
+            for project in projects:
+                display_name = f"{project['graphml_source']} ({project['annotation_count']} annotations) - {project['saved_at'][:16]}"
+                project_options[display_name] = project['filename']
+            
+            selected_display = st.selectbox(
+                "Select a previous project:",
+                options=list(project_options.keys()),
+                help="Projects are named after the original GraphML file and show creation time"
+            )
+            
+            if selected_display and st.button("Load Selected Project", use_container_width=True):
+                selected_filename = project_options[selected_display]
+                return ("project", selected_filename)
+        return None
+    
+    @staticmethod
+    def _render_sample_upload():
+        """Render the sample data option; returns "sample" when requested."""
+        st.markdown("""
+        <div class="detail-panel">
+            <p><strong>Sample Dataset:</strong> Chemical molecular network with 275 nodes and 565 edges</p>
+            <p>Perfect for exploring the interface features and testing functionality</p>
+        </div>
         """, unsafe_allow_html=True)
-        
-        st.title("Chemical Data Network Visualization")
-        st.markdown("---")
+        if st.button("Load Sample Network", use_container_width=True):
+            return "sample"
+        return None
     
     @staticmethod
     def render_data_upload() -> Optional[ChemicalNetwork]:
@@ -534,77 +818,20 @@ class UIComponents:
         </div>
         """, unsafe_allow_html=True)
         
+        # Each data source renders its own widgets and returns the load request, if any
+        handlers = {
+            "Upload GraphML File": UIComponents._render_graphml_upload,
+            "Load Previous Project": UIComponents._render_project_upload,
+            "Use Sample Data": UIComponents._render_sample_upload
+        }
+        
         with st.expander("Load Network Data", expanded=True):
             upload_type = st.radio(
                 "Choose your data source:",
-                ["Upload GraphML File", "Load Previous Project", "Use Sample Data"],
+                list(handlers),
                 help="GraphML files preserve all node and edge attributes. Previous projects restore your annotations."
             )
-            
-            if upload_type == "Upload GraphML File":
-                st.markdown("""
-                <div class="detail-panel">
-                    <p><strong>GraphML Format:</strong> Preserves all node and edge attributes</p>
-                    <p>Compatible with Cytoscape, Gephi, yEd, and other network analysis tools</p>
-                    <p><em>Drag and drop your .graphml file below or click to browse</em></p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                graphml_file = st.file_uploader(
-                    "Select GraphML file",
-                    type=['graphml', 'xml'],
-                    key="network_graphml",
-                    help="GraphML files preserve all node and edge attributes from tools like Cytoscape, Gephi, or yEd"
-                )
-                
-                if graphml_file:
-                    return ("graphml", graphml_file)
-                    
-            elif upload_type == "Load Previous Project":
-                st.markdown("""
-                <div class="detail-panel">
-                    <p><strong>Previous Projects:</strong> Load your saved work with annotations</p>
-                    <p>Select from previously worked on GraphML files with your SMILES annotations</p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Import here to avoid circular imports
-                from ..utils.annotation_manager import AnnotationManager
-                annotation_manager = AnnotationManager()
-                
-                # Get available projects
-                projects = annotation_manager.get_available_projects()
-                
-                if not projects:
-                    st.info("No previous projects found. Upload a GraphML file and annotate some nodes to create your first project.")
-                else:
-                    # Create options for dropdown
-                    project_options = {}
-                    for project in projects:
-                        display_name = f"{project['graphml_source']} ({project['annotation_count']} annotations) - {project['saved_at'][:16]}"
-                        project_options[display_name] = project['filename']
-                    
-                    selected_display = st.selectbox(
-                        "Select a previous project:",
-                        options=list(project_options.keys()),
-                        help="Projects are named after the original GraphML file and show creation time"
-                    )
-                    
-                    if selected_display and st.button("Load Selected Project", use_container_width=True):
-                        selected_filename = project_options[selected_display]
-                        return ("project", selected_filename)
-            
-            elif upload_type == "Use Sample Data":
-                st.markdown("""
-                <div class="detail-panel">
-                    <p><strong>Sample Dataset:</strong> Chemical molecular network with 275 nodes and 565 edges</p>
-                    <p>Perfect for exploring the interface features and testing functionality</p>
-                </div>
-                """, unsafe_allow_html=True)
-                if st.button("Load Sample Network", use_container_width=True):
-                    return "sample"
-        
-        return None
+            return handlers[upload_type]()
     
     @staticmethod
     def render_network_stats(network: ChemicalNetwork):
@@ -616,12 +843,13 @@ class UIComponents:
         with col2:
             st.metric("Total Edges", len(network.edges))
         
+        # Each enum member maps to one value, so counting members equals counting values
         with col3:
-            node_types = set(node.node_type.value for node in network.nodes)
+            node_types = {node.node_type for node in network.nodes}
             st.metric("Node Types", len(node_types))
         
         with col4:
-            edge_types = set(edge.edge_type.value for edge in network.edges)
+            edge_types = {edge.edge_type for edge in network.edges}
             st.metric("Edge Types", len(edge_types))
     
     @staticmethod
@@ -632,83 +860,80 @@ class UIComponents:
         </div>
         """, unsafe_allow_html=True)
         
-        with st.expander("View Raw Data Tables", expanded=False):
-            tab1, tab2 = st.tabs(["Nodes", "Edges"])
-            
-            with tab1:
-                try:
-                    nodes_data = []
-                    for node in network.nodes:
-                        node_dict = {
-                            "ID": node.id,
-                            "Label": node.label,
-                            "Type": node.node_type.value
+        # A toggle rather than an expander: collapsed expanders still run their body
+        if not st.toggle("View Raw Data Tables", key="show_data_tables"):
+            return
+        
+        max_rows = st.number_input("Rows per table", min_value=1, value=1000, step=500, key="data_tables_max_rows")
+        nodes = network.nodes[:max_rows]
+        edges = network.edges[:max_rows]
+        if len(network.nodes) > max_rows or len(network.edges) > max_rows:
+            st.caption(f"Showing the first {max_rows} rows of each table")
+        
+        tab1, tab2 = st.tabs(["Nodes", "Edges"])
+        
+        with tab1:
+            try:
+                if nodes:
+                    nodes_df = pd.DataFrame(UIComponents._build_table_columns(
+                        nodes,
+                        {
+                            "ID": [node.id for node in nodes],
+                            "Label": [node.label for node in nodes],
+                            "Type": [node.node_type.value for node in nodes]
                         }
-                        # Sanitize property keys and add them
-                        for key, value in node.properties.items():
-                            sanitized_key = UIComponents._sanitize_column_name(key)
-                            node_dict[sanitized_key] = value
-                        nodes_data.append(node_dict)
+                    ))
+                    # Normalize column names
+                    nodes_df.columns = [UIComponents._sanitize_column_name(col) for col in nodes_df.columns]
+                    # Normalize data types
+                    nodes_df = UIComponents._normalize_dataframe_types(nodes_df)
                     
-                    if nodes_data:
-                        nodes_df = pd.DataFrame(nodes_data)
-                        # Normalize column names
-                        nodes_df.columns = [UIComponents._sanitize_column_name(col) for col in nodes_df.columns]
-                        # Normalize data types
-                        nodes_df = UIComponents._normalize_dataframe_types(nodes_df)
-                        
-                        st.dataframe(
-                            nodes_df, 
-                            use_container_width=True,
-                            hide_index=True
-                        )
-                    else:
-                        st.info("No node data to display")
-                        
-                except Exception as e:
-                    st.error(f"Error displaying nodes table: {str(e)}")
-                    # Fallback: show basic info
-                    st.write(f"Nodes count: {len(network.nodes)}")
-                    if network.nodes:
-                        st.write("Sample node properties:", list(network.nodes[0].properties.keys())[:10])
-            
-            with tab2:
-                try:
-                    edges_data = []
-                    for edge in network.edges:
-                        edge_dict = {
-                            "Source": edge.source,
-                            "Target": edge.target,
-                            "Type": edge.edge_type.value,
-                            "Weight": edge.weight
+                    st.dataframe(
+                        nodes_df, 
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                else:
+                    st.info("No node data to display")
+                    
+            except Exception as e:
+                st.error(f"Error displaying nodes table: {str(e)}")
+                # Fallback: show basic info
+                st.write(f"Nodes count: {len(network.nodes)}")
+                if nodes:
+                    st.write("Sample node properties:", list(islice(network.nodes[0].properties, 10)))
+        
+        with tab2:
+            try:
+                if edges:
+                    edges_df = pd.DataFrame(UIComponents._build_table_columns(
+                        edges,
+                        {
+                            "Source": [edge.source for edge in edges],
+                            "Target": [edge.target for edge in edges],
+                            "Type": [edge.edge_type.value for edge in edges],
+                            "Weight": [edge.weight for edge in edges]
                         }
-                        # Sanitize property keys and add them
-                        for key, value in edge.properties.items():
-                            sanitized_key = UIComponents._sanitize_column_name(key)
-                            edge_dict[sanitized_key] = value
-                        edges_data.append(edge_dict)
+                    ))
+                    # Normalize column names
+                    edges_df.columns = [UIComponents._sanitize_column_name(col) for col in edges_df.columns]
+                    # Normalize data types
+                    edges_df = UIComponents._normalize_dataframe_types(edges_df)
                     
-                    if edges_data:
-                        edges_df = pd.DataFrame(edges_data)
-                        # Normalize column names
-                        edges_df.columns = [UIComponents._sanitize_column_name(col) for col in edges_df.columns]
-                        # Normalize data types
-                        edges_df = UIComponents._normalize_dataframe_types(edges_df)
-                        
-                        st.dataframe(
-                            edges_df, 
-                            use_container_width=True,
-                            hide_index=True
-                        )
-                    else:
-                        st.info("No edge data to display")
-                        
-                except Exception as e:
-                    st.error(f"Error displaying edges table: {str(e)}")
-                    # Fallback: show basic info
-                    st.write(f"Edges count: {len(network.edges)}")
-                    if network.edges:
-                        st.write("Sample edge properties:", list(network.edges[0].properties.keys())[:10])
+                    st.dataframe(
+                        edges_df, 
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                else:
+                    st.info("No edge data to display")
+                    
+            except Exception as e:
+                st.error(f"Error displaying edges table: {str(e)}")
+                # Fallback: show basic info
+                st.write(f"Edges count: {len(network.edges)}")
+                if edges:
+                    st.write("Sample edge properties:", list(islice(network.edges[0].properties, 10)))
     
     @staticmethod
     def render_export_options():
@@ -771,8 +996,6 @@ class UIComponents:
             return
         
         try:
-            from ..utils.annotation_manager import AnnotationManager
-            
             annotation_manager = AnnotationManager()
             network = st.session_state.network
             
@@ -787,12 +1010,13 @@ class UIComponents:
             annotated_nodes = [n for n in network_with_annotations.nodes 
                              if n.properties.get('annotation_status') == 'user_annotated']
             
-            # Read the file for download
-            with open(output_path, 'rb') as f:
-                graphml_data = f.read()
+            # Read the file for download, then remove it - the data is held in memory
+            export_file = Path(output_path)
+            graphml_data = export_file.read_bytes()
+            export_file.unlink(missing_ok=True)
             
             # Provide download button
-            filename = output_path.split('/')[-1]  # Get just the filename
+            filename = export_file.name
             st.download_button(
                 label=f"📥 Download {filename}",
                 data=graphml_data,
@@ -807,19 +1031,15 @@ class UIComponents:
             # Show some details about what's included
             if len(annotated_nodes) > 0:
                 with st.expander("Annotation Details", expanded=False):
-                    st.write("**Annotated nodes:**")
-                    for node in annotated_nodes[:10]:  # Show first 10
-                        smiles = node.properties.get('library_SMILES', 'Unknown')
-                        st.write(f"- {node.label} ({node.id}): `{smiles[:50]}...`")
+                    # Build the list once and emit it as a single markdown block
+                    lines = ["**Annotated nodes:**"]
+                    lines.extend(
+                        f"- {node.label} ({node.id}): `{_truncate(str(node.properties.get('library_SMILES', 'Unknown')))}`"
+                        for node in annotated_nodes[:10]  # Show first 10
+                    )
                     if len(annotated_nodes) > 10:
-                        st.write(f"... and {len(annotated_nodes) - 10} more")
-            
-            # Clean up temporary file
-            import os
-            try:
-                os.remove(output_path)
-            except:
-                pass  # Don't worry if cleanup fails
+                        lines.append(f"\n... and {len(annotated_nodes) - 10} more")
+                    st.markdown('\n'.join(lines))
                 
         except Exception as e:
             st.error(f"❌ Export failed: {str(e)}")
@@ -850,11 +1070,8 @@ class UIComponents:
     @staticmethod
     def _render_smiles_annotation_section(node: 'ChemicalNode'):
         """Render SMILES annotation section for a node."""
-        from ..utils.annotation_manager import AnnotationManager
-        from ..utils.modifinder_utils import ModiFinderUtils
-        
-        # Initialize annotation manager
-        annotation_manager = AnnotationManager()
+        # Reuse the session's annotation manager
+        annotation_manager = AnnotationManager.get_session_manager()
         
         # Check current SMILES status
         current_smiles = node.properties.get('library_SMILES', '')
@@ -869,19 +1086,21 @@ class UIComponents:
             if annotation:
                 st.caption(f"Annotated: {annotation.get('timestamp', 'Unknown time')}")
             # Debug info
-            st.caption(f"DEBUG: annotation_status = {node.properties.get('annotation_status')}")
+            if _DEBUG:
+                st.caption(f"DEBUG: annotation_status = {node.properties.get('annotation_status')}")
         elif has_smiles:
-            st.info(f"SMILES data available: `{str(current_smiles)[:50]}...`")
+            st.info(f"SMILES data available: `{_truncate(str(current_smiles))}`")
         else:
             st.warning("No SMILES data - annotation needed")
         
         # Debug: Show all annotation-related properties
-        with st.expander("Debug: Node Properties", expanded=False):
-            annotation_props = {k: v for k, v in node.properties.items() if 'annotation' in k.lower() or k == 'library_SMILES'}
-            if annotation_props:
-                st.json(annotation_props)
-            else:
-                st.write("No annotation properties found")
+        if _DEBUG:
+            with st.expander("Debug: Node Properties", expanded=False):
+                annotation_props = {k: node.properties[k] for k in node.ANNOTATION_KEYS if k in node.properties}
+                if annotation_props:
+                    st.code(json.dumps(annotation_props, indent=2, default=str), language='json')
+                else:
+                    st.write("No annotation properties found")
         
         # SMILES input form
         with st.expander("Add/Edit SMILES", expanded=not has_smiles):
@@ -909,12 +1128,21 @@ class UIComponents:
                 st.markdown("#### Preview:")
                 
                 # Basic SMILES validation
-                if UIComponents._validate_smiles_basic(new_smiles):
+                if UIComponents._is_valid_smiles(new_smiles.strip()):
                     # Show molecular structure preview
                     if ModiFinderUtils.is_available():
                         try:
-                            with st.spinner("Generating molecular structure preview..."):
-                                img_base64 = ModiFinderUtils.generate_molecule_image(new_smiles.strip())
+                            # Reuse the last preview while the SMILES is unchanged
+                            preview_smiles = new_smiles.strip()
+                            last_preview_key = f"last_preview_{node.id}"
+                            last_image_key = f"last_preview_img_{node.id}"
+                            if st.session_state.get(last_preview_key) == preview_smiles:
+                                img_base64 = st.session_state.get(last_image_key)
+                            else:
+                                with st.spinner("Generating molecular structure preview..."):
+                                    img_base64 = ModiFinderUtils.generate_molecule_image(preview_smiles)
+                                st.session_state[last_preview_key] = preview_smiles
+                                st.session_state[last_image_key] = img_base64
                                 
                             if img_base64:
                                 ModiFinderUtils.display_image_from_base64(
@@ -965,30 +1193,44 @@ class UIComponents:
             return False
         
         # Basic character check - SMILES should contain valid characters
-        valid_chars = set('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789()[]{}=#+-.@/\\')
-        if not all(c in valid_chars for c in smiles):
+        if _SMILES_INVALID_RE.search(smiles):
             return False
         
-        # Basic bracket matching
-        brackets = {'(': ')', '[': ']', '{': '}'}
+        # Cheap balance check (str.count runs in C) before checking nesting order
+        for opener, closer in _SMILES_BRACKETS.items():
+            if smiles.count(opener) != smiles.count(closer):
+                return False
+
+        # Basic bracket matching (only bracket characters need to be visited)
         stack = []
-        for char in smiles:
-            if char in brackets:
-                stack.append(brackets[char])
-            elif char in brackets.values():
+        for char in _SMILES_BRACKET_RE.findall(smiles):
+            if char in _SMILES_BRACKETS:
+                stack.append(_SMILES_BRACKETS[char])
+            elif char in _SMILES_CLOSERS:
                 if not stack or stack.pop() != char:
                     return False
         
         return len(stack) == 0
     
+    @staticmethod
+    @st.cache_data(max_entries=2048, show_spinner=False)
+    def _is_valid_smiles(smiles: str) -> bool:
+        """Validate SMILES with RDKit's parser, falling back to the basic check."""
+        if not smiles or not smiles.strip():
+            return False
+        
+        try:
+            from rdkit import Chem
+        except ImportError:
+            return UIComponents._validate_smiles_basic(smiles)
+        
+        return Chem.MolFromSmiles(smiles, sanitize=False) is not None
+    
     @staticmethod
     def _handle_smiles_update(node: 'ChemicalNode', new_smiles: str):
         """Handle SMILES update button click."""
-        from ..utils.annotation_manager import AnnotationManager
-        from datetime import datetime
-        
-        # Initialize annotation manager
-        annotation_manager = AnnotationManager()
+        # Reuse the session's annotation manager
+        annotation_manager = AnnotationManager.get_session_manager()
         
         try:
             # Get original SMILES
@@ -1019,8 +1261,7 @@ class UIComponents:
                 st.success(f"SMILES annotation added for {node.label}")
                 
                 # Auto-process the annotation immediately to generate ModiFinder links
-                from ..data.annotation_processor import AnnotationProcessor
-                processor = AnnotationProcessor()
+                processor = AnnotationProcessor.get_session_processor()
                 
                 if st.session_state.network:
                     with st.spinner("Processing annotation and generating ModiFinder links..."):
@@ -1049,6 +1290,141 @@ class UIComponents:
         except Exception as e:
             st.error(f"Error updating SMILES: {str(e)}")
     
+    @staticmethod
+    def _get_node_panel_data(node: 'ChemicalNode') -> Dict[str, Any]:
+        """Categorize node properties for the detail panel, memoized per node in session state."""
+        panel_cache = st.session_state.setdefault('_panel_cache', {})
+        
+        # Annotation updates change library_SMILES and annotation_timestamp
+        signature = (
+            len(node.properties),
+            node.properties.get('library_SMILES'),
+            node.properties.get('annotation_timestamp')
+        )
+        cached = panel_cache.get(node.id)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        
+        # Check if we have SMILES data for molecular structure
+        smiles = node.properties.get('library_SMILES')
+        has_smiles = bool(smiles and str(smiles).strip())
+        
+        # Check if we have spectrum data
+        has_spectrum = any(node.properties.get(field) for field in SPECTRUM_FIELDS)
+        
+        # Group properties into categories in a single pass over the node properties
+        buckets = {'struct': [], 'anal': [], 'class': [], 'other': {}}
+        for property_key, value in node.properties.items():
+            if value is None or not str(value).strip():
+                continue
+            display_name = FIELD_MAPPINGS.get(property_key)
+            if display_name is None:
+                buckets['other'][property_key] = value
+            elif property_key in STRUCTURAL_KEYS:
+                buckets['struct'].append({'key': property_key, 'name': display_name, 'value': value})
+            elif property_key in ANALYTICAL_KEYS:
+                buckets['anal'].append({'key': property_key, 'name': display_name, 'value': value})
+            else:
+                buckets['class'].append({'key': property_key, 'name': display_name, 'value': value})
+        
+        # Keep mapped fields in FIELD_MAPPINGS display order
+        for bucket in ('struct', 'anal', 'class'):
+            buckets[bucket].sort(key=lambda prop: _FIELD_ORDER[prop['key']])
+        
+        panel_data = {
+            'smiles': smiles,
+            'has_smiles': has_smiles,
+            'has_spectrum': has_spectrum,
+            'structural_props': buckets['struct'],
+            'analytical_props': buckets['anal'],
+            'classification_props': buckets['class'],
+            'other_properties': buckets['other']
+        }
+        panel_cache[node.id] = (signature, panel_data)
+        return panel_data
+    
+    @staticmethod
+    def _build_chemical_property_sections(panel_data: Dict[str, Any]) -> List[str]:
+        """Build one markdown block per non-empty chemical property section."""
+        sections = []
+        structural_props = panel_data['structural_props']
+        analytical_props = panel_data['analytical_props']
+        classification_props = panel_data['classification_props']
+        
+        # Categorized properties (one markdown block per section)
+        if structural_props:
+            rows = ''.join(
+                (_CHEMICAL_PROPERTY_ITEM_HTML if prop['key'] in CHEMICAL_DATA_KEYS else _PROPERTY_ITEM_HTML)
+                .format(name=prop['name'], value=prop['value'])
+                for prop in structural_props
+            )
+            sections.append("#### Structural Information\n" + rows)
+        
+        if analytical_props:
+            rows = ''.join(
+                _PROPERTY_ITEM_HTML.format(name=prop['name'], value=prop['value'])
+                for prop in analytical_props
+            )
+            sections.append("#### Analytical Data\n" + rows)
+        
+        if classification_props:
+            rows = ''.join(
+                _PROPERTY_ITEM_HTML.format(name=prop['name'], value=prop['value'])
+                for prop in classification_props
+            )
+            sections.append("#### Classification\n" + rows)
+        
+        # Any additional properties not in the mapping
+        other_properties = panel_data['other_properties']
+        
+        if other_properties:
+            rows = []
+            for key, value in other_properties.items():
+                formatted_key = _pretty(key)
+                value_str = str(value)
+        
+                # Check if this might be a chemical formula or SMILES string
+                if _CHEM_DATA_RE.search(value_str):
+                    # Likely chemical data - use improved styling
+                    rows.append(_CHEMICAL_PROPERTY_ITEM_HTML.format(name=formatted_key, value=value_str))
+                else:
+                    # Regular display with improved styling
+                    rows.append(_PROPERTY_ITEM_HTML.format(name=formatted_key, value=value))
+            sections.append("#### Additional Properties\n" + ''.join(rows))
+        
+        return sections
+    
+    @staticmethod
+    def _render_chemical_properties(panel_data: Dict[str, Any]):
+        """Render the categorized chemical properties of a node."""
+        st.markdown("### Chemical Properties")
+        
+        # Section HTML lives alongside the memoized panel data, so reruns skip rebuilding it
+        sections = panel_data.get('property_sections')
+        if sections is None:
+            sections = UIComponents._build_chemical_property_sections(panel_data)
+            panel_data['property_sections'] = sections
+        for section in sections:
+            st.markdown(section, unsafe_allow_html=True)
+        
+        st.markdown('</div>', unsafe_allow_html=True)  # Close content-section
+    
+    @staticmethod
+    def _render_generated_image(heading: str, subject: str, generate: Callable[[], Optional[str]], caption: str):
+        """Render a ModiFinder image section; generate() hits the ModiFinderUtils image caches."""
+        st.markdown(f"#### {heading}")
+        ModiFinderUtils.render_loading_placeholder(f"Generating {subject}...")
+        
+        if not ModiFinderUtils.is_available():
+            ModiFinderUtils.render_error_placeholder("ModiFinder package not available")
+            return
+        
+        img_base64 = generate()
+        if img_base64:
+            ModiFinderUtils.display_image_from_base64(img_base64, caption)
+        else:
+            ModiFinderUtils.render_error_placeholder(f"Could not generate {subject}")
+    
     @staticmethod
     def render_node_detail_panel(node: 'ChemicalNode'):
         """Render detailed information panel for a selected node with two-column layout."""
@@ -1056,13 +1432,15 @@ class UIComponents:
         st.markdown(f"""
         <div class="content-section">
             <h2>{node.label}</h2>
-            <div style="display: flex; gap: 2rem; margin-bottom: 1rem;">
+            <div class="detail-meta">
                 <div><strong>ID:</strong> <code>{node.id}</code></div>
-                <div><strong>Type:</strong> <span style="background: #e3f2fd; padding: 0.25rem 0.5rem; border-radius: 4px; font-size: 0.9rem;">{node.node_type.value}</span></div>
+                <div><strong>Type:</strong> <span class="type-badge">{node.node_type.value}</span></div>
             </div>
         </div>
         """, unsafe_allow_html=True)
         
+        panel_data = UIComponents._get_node_panel_data(node)
+        
         # Create two-column layout
         col_info, col_viz = st.columns([1, 1])
         
@@ -1070,180 +1448,99 @@ class UIComponents:
         with col_info:
             # SMILES Annotation Section
             UIComponents._render_smiles_annotation_section(node)
+            UIComponents._render_chemical_properties(panel_data)
         
         # RIGHT COLUMN: Molecule Visualization
         with col_viz:
-            # Import ModiFinder utilities
-            from ..utils.modifinder_utils import ModiFinderUtils
-            
-            # Check if we have SMILES data for molecular structure
-            smiles = node.properties.get('library_SMILES')
-            has_smiles = smiles and str(smiles).strip()
-            
-            # Check if we have spectrum data
-            spectrum_fields = ['spectrum_id', 'SpectrumID', 'usi', 'USI']
-            has_spectrum = any(node.properties.get(field) for field in spectrum_fields)
+            smiles = panel_data['smiles']
+            has_smiles = panel_data['has_smiles']
+            has_spectrum = panel_data['has_spectrum']
             
             # Display molecular structure (priority)
             if has_smiles:
-                st.markdown("#### Molecular Structure")
-                ModiFinderUtils.render_loading_placeholder("Generating molecular structure...")
-                
-                if ModiFinderUtils.is_available():
-                    img_base64 = ModiFinderUtils.generate_molecule_image(str(smiles).strip())
-                    if img_base64:
-                        ModiFinderUtils.display_image_from_base64(
-                            img_base64, 
-                            f"Molecular Structure: {node.label}"
-                        )
-                    else:
-                        ModiFinderUtils.render_error_placeholder("Could not generate molecular structure")
-                else:
-                    ModiFinderUtils.render_error_placeholder("ModiFinder package not available")
+                UIComponents._render_generated_image(
+                    "Molecular Structure",
+                    "molecular structure",
+                    lambda: ModiFinderUtils.generate_molecule_image(str(smiles).strip()),
+                    f"Molecular Structure: {node.label}"
+                )
             
             # Display spectrum visualization if available
             if has_spectrum:
-                st.markdown("#### Spectrum Visualization")
-                ModiFinderUtils.render_loading_placeholder("Generating spectrum visualization...")
-                
-                if ModiFinderUtils.is_available():
-                    img_base64 = ModiFinderUtils.generate_spectrum_image(node.properties)
-                    if img_base64:
-                        ModiFinderUtils.display_image_from_base64(
-                            img_base64, 
-                            f"Spectrum: {node.label}"
-                        )
-                    else:
-                        ModiFinderUtils.render_error_placeholder("Could not generate spectrum visualization")
-                else:
-                    ModiFinderUtils.render_error_placeholder("ModiFinder package not available")
+                UIComponents._render_generated_image(
+                    "Spectrum Visualization",
+                    "spectrum visualization",
+                    lambda: ModiFinderUtils.generate_spectrum_image(node.properties),
+                    f"Spectrum: {node.label}"
+                )
             
             # Show message if no visualization data available
             if not has_smiles and not has_spectrum:
                 st.info("No molecular structure or spectrum data available for visualization")
         
-        # Back to LEFT COLUMN: Add Chemical Properties
-        with col_info:
-            st.markdown("### Chemical Properties")
-            
-            # Field mapping as requested by user
-            field_mappings = {
-                'library_SMILES': 'SMILES',
-                'library_compound_name': 'Compound Name',
-                'library_InChI': 'InChI',
-                'rt': 'Retention Time',
-                'mz': 'Precursor Mass',
-                'library_classfire_superclass': 'ClassyFire Superclass',
-                'library_classyfire_class': 'ClassyFire Class',
-                'library_classyfire_subclass': 'ClassyFire Subclass',
-                'library_npclassifier_superclass': 'npclassifier Super Class',
-                'library_npclassifier_class': 'npclassifier Class',
-                'library_npclassifier_pathway': 'npclassifier Pathway',
-                'SpectrumID': 'Spectrum ID',
-                'Compound_Name': 'Compound Name',
-                'Adduct': 'Adduct',
-                'molecular_formula': 'Molecular Formula'
-            }
-        
-            displayed_fields = set()
-            
-            # Group properties into categories
-            structural_props = []
-            analytical_props = []
-            classification_props = []
-            
-            for property_key, display_name in field_mappings.items():
-                if property_key in node.properties:
-                    value = node.properties[property_key]
-                    if value is not None and str(value).strip():
-                        prop_data = {
-                            'key': property_key,
-                            'name': display_name,
-                            'value': value
-                        }
-                        
-                        # Categorize properties
-                        if property_key in ['library_SMILES', 'library_InChI', 'molecular_formula']:
-                            structural_props.append(prop_data)
-                        elif property_key in ['rt', 'mz', 'SpectrumID', 'Adduct']:
-                            analytical_props.append(prop_data)
-                        else:
-                            classification_props.append(prop_data)
-                        
-                        displayed_fields.add(property_key)
-            
-            # Display categorized properties
-            if structural_props:
-                st.markdown("#### Structural Information")
-                for prop in structural_props:
-                    if prop['key'] in ['library_SMILES', 'library_InChI']:
-                        st.markdown(f"""
-                        <div class="property-item">
-                            <strong>{prop['name']}:</strong>
-                            <div class="chemical-data">{str(prop['value'])}</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    else:
-                        st.markdown(f"""
-                        <div class="property-item">
-                            <strong>{prop['name']}:</strong> {prop['value']}
-                        </div>
-                        """, unsafe_allow_html=True)
-            
-            if analytical_props:
-                st.markdown("#### Analytical Data")
-                for prop in analytical_props:
-                    st.markdown(f"""
-                    <div class="property-item">
-                        <strong>{prop['name']}:</strong> {prop['value']}
-                    </div>
-                    """, unsafe_allow_html=True)
-            
-            if classification_props:
-                st.markdown("#### Classification")
-                for prop in classification_props:
-                    st.markdown(f"""
-                    <div class="property-item">
-                        <strong>{prop['name']}:</strong> {prop['value']}
-                    </div>
-                    """, unsafe_allow_html=True)
-            
-            # Display any additional properties not in the mapping
-            other_properties = {k: v for k, v in node.properties.items() 
-                              if k not in displayed_fields and v is not None and str(v).strip()}
-            
-            if other_properties:
-                st.markdown("#### Additional Properties")
-                for key, value in other_properties.items():
-                    formatted_key = key.replace('_', ' ').title()
-                    value_str = str(value)
-                
-                    # Check if this might be a chemical formula or SMILES string
-                    if any(pattern in value_str.lower() for pattern in ['smiles', 'inchi']) or \
-                       any(char in value_str for char in ['=', '+', '-', '(', ')', '[', ']', '@']):
-                        # Likely chemical data - use improved styling
-                        st.markdown(f"""
-                        <div class="property-item">
-                            <strong>{formatted_key}:</strong>
-                            <div class="chemical-data">{value_str}</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    else:
-                        # Regular display with improved styling
-                        st.markdown(f"""
-                        <div class="property-item">
-                            <strong>{formatted_key}:</strong> {value}
-                        </div>
-                        """, unsafe_allow_html=True)
-            
-            st.markdown('</div>', unsafe_allow_html=True)  # Close content-section
-        
         # Action button with improved styling - outside columns
         st.markdown("---")
-        if st.button("Close Details", key=f"close_details_{node.id}", use_container_width=True):
-            if 'selected_node_id' in st.session_state:
-                del st.session_state.selected_node_id
-            st.rerun()
+        st.button(
+            "Close Details",
+            key="close_node_details",
+            use_container_width=True,
+            on_click=_set_session_state,
+            args=('selected_node_id', None)
+        )
+    
+    @staticmethod
+    def _build_formula_candidates_html(candidates: List[Dict[str, Any]]) -> str:
+        """Build the formula candidate list as a single HTML block."""
+        rows = []
+        for i, candidate in enumerate(candidates, 1):
+            # Color code based on ranking
+            rank_class = "rank-best" if i == 1 else "rank-top" if i <= 3 else ""
+            rows.append(_FORMULA_CANDIDATE_HTML.format(
+                rank_class=rank_class,
+                rank=i,
+                formula=candidate.get('formula', 'Unknown'),
+                error_da=candidate.get('mass_error', 0),
+                error_ppm=candidate.get('mass_error_ppm', 0)
+            ))
+        
+        return (
+            '<div class="formula-candidates">'
+            + ''.join(rows)
+            + '</div>'
+        )
+    
+    @staticmethod
+    def _build_connected_node_html(role: str, node: 'ChemicalNode') -> str:
+        """Build the summary panel for one end of an edge as a single HTML block."""
+        # Show key properties (escaped, e.g. '<' or '&' in compound names)
+        compound = node.properties.get('library_compound_name')
+        compound_row = (
+            _PROPERTY_ITEM_HTML.format(name="Compound", value=html.escape(str(compound)))
+            if compound is not None else ''
+        )
+        return _CONNECTED_NODE_HTML.format(
+            role=role,
+            label=html.escape(str(node.label)),
+            node_id=html.escape(str(node.id)),
+            node_type=node.node_type.value,
+            compound_row=compound_row
+        )
+    
+    @staticmethod
+    def _render_connected_node(role: str, node: 'ChemicalNode'):
+        """Render the summary panel for one end of an edge, with its SMILES as a code block."""
+        # Label, ID, type and compound name are fixed for a loaded network (cache is reset on load)
+        html_cache = st.session_state.setdefault('_edge_html_cache', {})
+        cache_key = ('connected', role, node.id)
+        panel_html = html_cache.get(cache_key)
+        if panel_html is None:
+            panel_html = UIComponents._build_connected_node_html(role, node)
+            html_cache[cache_key] = panel_html
+        _render_html(panel_html)
+        smiles = node.properties.get('library_SMILES')
+        if smiles is not None:
+            st.caption("SMILES")
+            st.code(str(smiles), language=None)
     
     @staticmethod
     def render_edge_detail_panel(edge: 'ChemicalEdge', network: 'ChemicalNetwork'):
@@ -1252,8 +1549,8 @@ class UIComponents:
         st.markdown(f"""
         <div class="content-section">
             <h2>Edge: {edge.source} → {edge.target}</h2>
-            <div style="display: flex; gap: 2rem; margin-bottom: 1rem;">
-                <div><strong>Type:</strong> <span style="background: #fff3cd; padding: 0.25rem 0.5rem; border-radius: 4px; font-size: 0.9rem;">{edge.edge_type.value}</span></div>
+            <div class="detail-meta">
+                <div><strong>Type:</strong> <span class="edge-type-badge">{edge.edge_type.value}</span></div>
                 <div><strong>Weight:</strong> <code>{edge.weight}</code></div>
             </div>
         </div>
@@ -1330,86 +1627,59 @@ class UIComponents:
             st.markdown("### Edge Properties")
             
             # Check for mass decomposition results first
-            if 'formula_candidates' in edge.properties:
-                st.markdown("#### Possible Molecular Formulas")
+            candidates = edge.properties.get('formula_candidates')
+            if candidates is not None:
+                formula_parts = ["#### Possible Molecular Formulas\n"]
                 
                 # Display delta_mz value if present
                 delta_mz = edge.properties.get('delta_mz')
                 if delta_mz:
-                    st.markdown(f"""
-                    <div class="property-item">
-                        <strong>Delta m/z:</strong> {float(delta_mz):.4f} Da
-                    </div>
-                    """, unsafe_allow_html=True)
+                    formula_parts.append(_PROPERTY_ITEM_HTML.format(name="Delta m/z", value=f"{float(delta_mz):.4f} Da"))
                     
                 # Display primary formula
                 primary_formula = edge.properties.get('primary_formula')
                 if primary_formula:
-                    mass_error = edge.properties.get('formula_mass_error', 0)
-                    mass_error_ppm = edge.properties.get('formula_mass_error_ppm', 0)
-                    st.markdown(f"""
-                    <div class="property-item" style="border-left: 4px solid #28a745;">
-                        <strong>Best Match:</strong> <code>{primary_formula}</code><br>
-                        <small>Error: {mass_error:.4f} Da ({mass_error_ppm:.1f} ppm)</small>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    formula_parts.append(_BEST_MATCH_HTML.format(
+                        formula=primary_formula,
+                        error_da=edge.properties.get('formula_mass_error', 0),
+                        error_ppm=edge.properties.get('formula_mass_error_ppm', 0)
+                    ))
+                st.markdown(''.join(formula_parts), unsafe_allow_html=True)
                 
                 # Display all candidates
-                candidates = edge.properties.get('formula_candidates', [])
                 if len(candidates) > 1:
                     with st.expander(f"View all {len(candidates)} formula candidates", expanded=False):
-                        st.markdown("""
-                        <div style="background: #f8f9fa; padding: 1rem; border-radius: 4px; margin: 0.5rem 0;">
-                        """, unsafe_allow_html=True)
-                        
-                        for i, candidate in enumerate(candidates, 1):
-                            formula = candidate.get('formula', 'Unknown')
-                            error_da = candidate.get('mass_error', 0)
-                            error_ppm = candidate.get('mass_error_ppm', 0)
-                            
-                            # Color code based on ranking
-                            border_color = "#28a745" if i == 1 else "#ffc107" if i <= 3 else "#6c757d"
-                            
-                            st.markdown(f"""
-                            <div style="background: white; border: 1px solid #dee2e6; border-left: 4px solid {border_color}; border-radius: 4px; padding: 0.75rem; margin: 0.5rem 0; display: flex; justify-content: space-between; align-items: center;">
-                                <div><strong>{i}. {formula}</strong></div>
-                                <div style="text-align: right; font-size: 0.9rem; color: #6c757d;">
-                                    <div>{error_da:.4f} Da</div>
-                                    <div>{error_ppm:.1f} ppm</div>
-                                </div>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        
-                        st.markdown("</div>", unsafe_allow_html=True)
+                        # Candidates are fixed at load time, so reuse the HTML across reruns
+                        html_cache = st.session_state.setdefault('_edge_html_cache', {})
+                        cache_key = (edge.source, edge.target, len(candidates), primary_formula)
+                        candidates_html = html_cache.get(cache_key)
+                        if candidates_html is None:
+                            candidates_html = UIComponents._build_formula_candidates_html(candidates)
+                            html_cache[cache_key] = candidates_html
+                        _render_html(candidates_html)
             
             # Display other properties
             st.markdown("#### Other Properties")
-            other_props_found = False
+            rows = []
             for key, value in edge.properties.items():
                 # Skip mass decomposition fields as they're displayed separately
                 if key in ['formula_candidates', 'primary_formula', 'formula_mass_error', 'formula_mass_error_ppm']:
                     continue
                     
                 if value is not None and str(value).strip():
-                    other_props_found = True
-                    formatted_key = key.replace('_', ' ').title()
+                    formatted_key = _pretty(key)
                     value_str = str(value)
                     
-                    if any(pattern in value_str.lower() for pattern in ['http', 'gnps', 'usi']):
+                    if _IDENTIFIER_DATA_RE.search(value_str):
                         # URL or special identifier - use chemical-data styling
-                        st.markdown(f"""
-                        <div class="property-item">
-                            <strong>{formatted_key}:</strong>
-                            <div class="chemical-data">{value_str}</div>
-                        </div>
-                        """, unsafe_allow_html=True)
+                        rows.append(_CHEMICAL_PROPERTY_ITEM_HTML.format(name=formatted_key, value=value_str))
                     else:
                         # Regular display
-                        st.markdown(f"""
-                        <div class="property-item">
-                            <strong>{formatted_key}:</strong> {value}
-                        </div>
-                        """, unsafe_allow_html=True)
+                        rows.append(_PROPERTY_ITEM_HTML.format(name=formatted_key, value=value))
+            
+            other_props_found = bool(rows)
+            if other_props_found:
+                st.markdown(''.join(rows), unsafe_allow_html=True)
             
             if not other_props_found:
                 st.info("No additional properties found for this edge")
@@ -1424,62 +1694,10 @@ class UIComponents:
             col1, col2 = st.columns(2)
             
             with col1:
-                st.markdown(f"""
-                <div class="detail-panel">
-                    <h4>Source: {source_node.label}</h4>
-                    <div class="property-item">
-                        <strong>ID:</strong> <code>{source_node.id}</code>
-                    </div>
-                    <div class="property-item">
-                        <strong>Type:</strong> <span style="background: #e3f2fd; padding: 0.25rem 0.5rem; border-radius: 4px; font-size: 0.9rem;">{source_node.node_type.value}</span>
-                    </div>
-                """, unsafe_allow_html=True)
-                
-                # Show key properties
-                if 'library_compound_name' in source_node.properties:
-                    st.markdown(f"""
-                    <div class="property-item">
-                        <strong>Compound:</strong> {source_node.properties['library_compound_name']}
-                    </div>
-                    """, unsafe_allow_html=True)
-                if 'library_SMILES' in source_node.properties:
-                    st.markdown(f"""
-                    <div class="property-item">
-                        <strong>SMILES:</strong>
-                        <div class="chemical-data">{str(source_node.properties['library_SMILES'])}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                st.markdown("</div>", unsafe_allow_html=True)
+                UIComponents._render_connected_node("Source", source_node)
             
             with col2:
-                st.markdown(f"""
-                <div class="detail-panel">
-                    <h4>Target: {target_node.label}</h4>
-                    <div class="property-item">
-                        <strong>ID:</strong> <code>{target_node.id}</code>
-                    </div>
-                    <div class="property-item">
-                        <strong>Type:</strong> <span style="background: #e3f2fd; padding: 0.25rem 0.5rem; border-radius: 4px; font-size: 0.9rem;">{target_node.node_type.value}</span>
-                    </div>
-                """, unsafe_allow_html=True)
-                
-                # Show key properties
-                if 'library_compound_name' in target_node.properties:
-                    st.markdown(f"""
-                    <div class="property-item">
-                        <strong>Compound:</strong> {target_node.properties['library_compound_name']}
-                    </div>
-                    """, unsafe_allow_html=True)
-                if 'library_SMILES' in target_node.properties:
-                    st.markdown(f"""
-                    <div class="property-item">
-                        <strong>SMILES:</strong>
-                        <div class="chemical-data">{str(target_node.properties['library_SMILES'])}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                st.markdown("</div>", unsafe_allow_html=True)
+                UIComponents._render_connected_node("Target", target_node)
         else:
             st.warning("Could not find complete node information for this edge")
         
@@ -1487,61 +1705,45 @@ class UIComponents:
         
         # Action button with improved styling
         st.markdown("---")
-        if st.button("Close Details", key=f"close_edge_details_{edge.source}_{edge.target}", use_container_width=True):
-            if 'selected_edge_id' in st.session_state:
-                del st.session_state.selected_edge_id
-            st.rerun()
+        st.button(
+            "Close Details",
+            key="close_edge_details",
+            use_container_width=True,
+            on_click=_set_session_state,
+            args=('selected_edge_id', None)
+        )
     
     @staticmethod
+    @_fragment
     def render_modifinder_visualization(modifinder_url: str):
         """
         Render ModiFinder visualization in an embedded iframe.
         
+        Runs as a fragment where supported, so hiding it only reruns this block.
+        
         Args:
             modifinder_url: The URL from the edge's modifinder_link property
         """
+        # Checked here too so a fragment-only rerun after "Hide" clears the viewer
+        if not st.session_state.get('show_modifinder_viz'):
+            return
+        
         st.markdown("### ModiFinder Spectrum Alignment")
         
         # Add some context
         st.caption("Interactive spectrum alignment visualization from ModiFinder")
         
-        # Create iframe HTML with responsive design
-        iframe_html = f"""
-        <style>
-            .modifinder-container {{
-                width: 100%;
-                height: 800px;
-                border: 2px solid #e0e0e0;
-                border-radius: 8px;
-                overflow: hidden;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                background-color: white;
-            }}
-            .modifinder-iframe {{
-                width: 100%;
-                height: 100%;
-                border: none;
-            }}
-        </style>
-        <div class="modifinder-container">
-            <iframe
-                src="{modifinder_url}"
-                class="modifinder-iframe"
-                frameborder="0"
-                loading="lazy"
-                allow="clipboard-write"
-            ></iframe>
-        </div>
-        """
-        
         # Display the iframe using components.html
-        components.html(iframe_html, height=820)
+        components.html(_MODIFINDER_FRAME_HTML.format(url=html.escape(modifinder_url)), height=820)
         
         # Add a link to open in new tab
         st.markdown(f"[Open in new tab]({modifinder_url})")
         
         # Add button to hide the visualization
-        if st.button("Hide Visualization", key="hide_modifinder"):
-            st.session_state.show_modifinder_viz = False
-            st.rerun()
+        st.button(
+            "Hide Visualization",
+            key="hide_modifinder",
+            on_click=_set_session_state,
+            args=('show_modifinder_viz', False)
+        )
     
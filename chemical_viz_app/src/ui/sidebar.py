@@ -1,9 +1,20 @@
 import streamlit as st
-from typing import Dict, List, Any, Optional, Tuple
+import functools
+from typing import Dict, FrozenSet, List, Any, Optional, Tuple
 from ..data.models import NodeType, EdgeType, ChemicalNetwork
 from ..visualization.filters import NetworkFilter
 
 
+@functools.lru_cache(maxsize=16)
+def _column_options(property_keys: FrozenSet[str], base_columns: Tuple[str, ...], first: str) -> Tuple[str, ...]:
+    """Sorted label column options, with the preferred column first when present."""
+    columns = set(base_columns).union(property_keys)
+    if first in columns:
+        columns.discard(first)
+        return (first,) + tuple(sorted(columns))
+    return tuple(sorted(columns))
+
+
 class SidebarControls:
     
     def __init__(self):
@@ -210,16 +221,8 @@ class SidebarControls:
         labeling_options = {}
         
         with st.sidebar.expander("Node Labels", expanded=True):
-            # Get all available columns from node properties
-            all_node_columns = set(['id', 'label'])  # Base columns
-            for node in network.nodes:
-                all_node_columns.update(node.properties.keys())
-            
-            # Sort columns with library_compound_name first if it exists
-            sorted_columns = sorted(all_node_columns)
-            if 'library_compound_name' in sorted_columns:
-                sorted_columns.remove('library_compound_name')
-                sorted_columns.insert(0, 'library_compound_name')
+            # Base columns plus node properties, sorted with library_compound_name first if it exists
+            sorted_columns = _column_options(network.get_node_property_keys(), ('id', 'label'), 'library_compound_name')
             
             node_label_column = st.selectbox(
                 "Display column for nodes:",
@@ -232,10 +235,7 @@ class SidebarControls:
         
         with st.sidebar.expander("Edge Labels"):
             # Check if delta_mz exists in the network
-            has_delta_mz = any(
-                "delta_mz" in edge.properties 
-                for edge in network.edges
-            )
+            has_delta_mz = "delta_mz" in network.get_edge_property_keys()
             
             # Enable edge labels by default if delta_mz is present
             default_edge_labels = has_delta_mz
@@ -249,16 +249,10 @@ class SidebarControls:
             labeling_options["edge_labels_enabled"] = edge_labels_enabled
             
             if edge_labels_enabled:
-                # Get all available columns from edge properties
-                all_edge_columns = set(['source', 'target', 'type', 'weight'])  # Base columns
-                for edge in network.edges:
-                    all_edge_columns.update(edge.properties.keys())
-                
-                # Sort columns with delta_mz first if it exists
-                sorted_edge_columns = sorted(all_edge_columns)
-                if 'delta_mz' in sorted_edge_columns:
-                    sorted_edge_columns.remove('delta_mz')
-                    sorted_edge_columns.insert(0, 'delta_mz')
+                # Base columns plus edge properties, sorted with delta_mz first if it exists
+                sorted_edge_columns = _column_options(
+                    network.get_edge_property_keys(), ('source', 'target', 'type', 'weight'), 'delta_mz'
+                )
                 
                 # Set default index for delta_mz if it exists, otherwise use first column
                 default_index = 0 if 'delta_mz' in sorted_edge_columns else 0
@@ -298,19 +292,12 @@ class SidebarControls:
                 )
                 sizing_options["fixed_size"] = fixed_size
             else:
-                all_numeric_properties = set()
-                for node in network.nodes:
-                    for prop, value in node.properties.items():
-                        try:
-                            float(value)
-                            all_numeric_properties.add(prop)
-                        except (TypeError, ValueError):
-                            pass
+                all_numeric_properties = network.get_numeric_node_properties()
                 
                 if all_numeric_properties:
                     property_name = st.selectbox(
                         "Select property:",
-                        options=list(all_numeric_properties),
+                        options=sorted(all_numeric_properties),
                         key="node_size_prop"
                     )
                     
@@ -377,10 +364,7 @@ class SidebarControls:
         
         with st.sidebar.expander("Library SMILES Filter"):
             # Check if any nodes have library_SMILES property 
-            has_library_smiles = any(
-                "library_SMILES" in node.properties 
-                for node in network.nodes
-            )
+            has_library_smiles = "library_SMILES" in network.get_node_property_keys()
             
             if has_library_smiles:
                 smiles_filter_enabled = st.checkbox(
@@ -399,10 +383,7 @@ class SidebarControls:
     def render_molecular_networking_filters(self, network: ChemicalNetwork) -> Dict[str, bool]:
         """Render molecular networking edge filters."""
         # Check if any edges have molecular_networking property
-        has_molecular_networking = any(
-            "molecular_networking" in edge.properties 
-            for edge in network.edges
-        )
+        has_molecular_networking = "molecular_networking" in network.get_edge_property_keys()
         
         filters = {}
         
@@ -432,30 +413,34 @@ class SidebarControls:
         
         return filters
     
+    @staticmethod
+    def _on_column_width_change():
+        """Slider callback: store the new ratio only when the width actually changes."""
+        col1_width = st.session_state.main_col_width
+        st.session_state.column_ratio = [col1_width, 6 - col1_width]
+    
     def render_column_width_control(self) -> List[int]:
         """Render column width ratio control slider."""
         st.sidebar.header("Layout Settings")
         
         with st.sidebar.expander("Column Width Control", expanded=True):
-            # Get current ratio from session state
-            current_ratio = st.session_state.get('column_ratio', [3, 1])
+            # Seed the slider from the stored ratio on first render
+            if 'main_col_width' not in st.session_state:
+                st.session_state.main_col_width = st.session_state.get('column_ratio', [3, 3])[0]
             
             # Single slider for controlling the ratio
             col1_width = st.slider(
                 "Main Column Width",
                 min_value=1,
                 max_value=5,
-                value=current_ratio[0],
                 key="main_col_width",
+                on_change=self._on_column_width_change,
                 help="Adjust the relative width of the network visualization column (1-5). The detail panel will use the remaining space."
             )
             
             # Calculate complementary width for second column
             col2_width = 6 - col1_width  # Total of 6 units for flexibility
-            
-            # Update session state
             new_ratio = [col1_width, col2_width]
-            st.session_state.column_ratio = new_ratio
             
             # Show current ratio
             st.caption(f"Current ratio: {col1_width}:{col2_width}")
@@ -467,4 +452,10 @@ class SidebarControls:
             if 'selected_edge_id' in st.session_state and st.session_state.selected_edge_id:
                 st.info("🔗 Third column is active for ModiFinder visualization")
             
-            return new_ratio
\ No newline at end of file
+            return new_ratio
+
+
+@st.cache_resource(show_spinner=False)
+def get_sidebar_controls() -> SidebarControls:
+    """Shared SidebarControls; it holds no per-session state, so one instance serves every rerun."""
+    return SidebarControls()
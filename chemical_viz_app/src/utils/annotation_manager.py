@@ -30,6 +30,21 @@ class AnnotationManager:
         self.annotations_path = self.annotations_dir / self.ANNOTATIONS_FILE
         self.current_project_file = None
     
+    @classmethod
+    def get_session_manager(cls) -> 'AnnotationManager':
+        """
+        Get the AnnotationManager for the current session, creating it once.
+        
+        Annotations live in session state, so the manager is shared per
+        session rather than process-wide.
+        
+        Returns:
+            The session's AnnotationManager instance
+        """
+        if '_annotation_manager' not in st.session_state:
+            st.session_state._annotation_manager = cls()
+        return st.session_state._annotation_manager
+    
     @staticmethod
     def initialize_session_state():
         """Initialize annotation-related session state variables."""
@@ -431,10 +446,16 @@ class AnnotationManager:
             Updated network with annotations applied
         """
         applied_count = 0
+        properties_changed = False
         
         for node in network.nodes:
             annotation = self.get_annotation(node.id)
             if annotation and annotation.get('status') in ['pending', 'applied']:
+                # Runs on every rerun; only a real change should invalidate the network's summaries
+                previous = tuple(node.properties.get(key) for key in ('library_SMILES', 'annotation_status', 'annotation_timestamp'))
+                if previous != (annotation['new_smiles'], 'user_annotated', annotation['timestamp']):
+                    properties_changed = True
+                
                 # Update node properties with annotated SMILES
                 node.properties['library_SMILES'] = annotation['new_smiles']
                 
@@ -446,6 +467,8 @@ class AnnotationManager:
                 self.update_annotation_status(node.id, 'applied')
                 applied_count += 1
         
+        if properties_changed:
+            network.invalidate_summaries()
         print(f"Applied {applied_count} annotations to network")
         
         # Debug: Check what annotations we have in session state
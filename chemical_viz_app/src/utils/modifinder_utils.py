@@ -34,6 +34,7 @@ class ModiFinderUtils:
     """Utility class for ModiFinder integration."""
     
     CACHE_TTL = 1800  # 30 minutes in seconds
+    CACHE_MAX_ENTRIES = 512  # Images kept per cached generator
     
     @staticmethod
     def is_available() -> bool:
@@ -99,11 +100,13 @@ class ModiFinderUtils:
         return None, None
     
     @staticmethod
-    @st.cache_data(ttl=CACHE_TTL)
     def generate_spectrum_image(node_data: Dict[str, Any]) -> Optional[str]:
         """
         Generate spectrum image using ModiFinder's draw_spectrum function.
         
+        The image is cached on the spectrum identifier, so unrelated property
+        changes (e.g. annotations) don't invalidate it.
+        
         Args:
             node_data: Dictionary containing node properties
             
@@ -114,20 +117,34 @@ class ModiFinderUtils:
             logger.error("ModiFinder not available for spectrum generation")
             return None
         
-        try:
-            # Look for spectrum identifier in node data
-            spectrum_fields = ['spectrum_id', 'SpectrumID', 'usi', 'USI']
-            spectrum_id = None
-            
-            for field in spectrum_fields:
-                if field in node_data and node_data[field]:
-                    spectrum_id = str(node_data[field])
-                    break
-            
-            if not spectrum_id:
-                logger.warning("No spectrum identifier found in node data")
-                return None
+        # Look for spectrum identifier in node data
+        spectrum_fields = ['spectrum_id', 'SpectrumID', 'usi', 'USI']
+        spectrum_id = None
+        
+        for field in spectrum_fields:
+            if field in node_data and node_data[field]:
+                spectrum_id = str(node_data[field])
+                break
+        
+        if not spectrum_id:
+            logger.warning("No spectrum identifier found in node data")
+            return None
+        
+        return ModiFinderUtils._draw_spectrum_image(spectrum_id)
+    
+    @staticmethod
+    @st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+    def _draw_spectrum_image(spectrum_id: str) -> Optional[str]:
+        """
+        Render a spectrum with ModiFinder and encode it as base64 PNG.
+        
+        Args:
+            spectrum_id: Spectrum identifier or USI
             
+        Returns:
+            Base64 encoded PNG image or None if generation fails
+        """
+        try:
             logger.info(f"Attempting to generate spectrum for ID: {spectrum_id}")
             
             # Generate spectrum plot using ModiFinder
@@ -190,7 +207,7 @@ class ModiFinderUtils:
             return None
     
     @staticmethod
-    @st.cache_data(ttl=CACHE_TTL)
+    @st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
     def generate_molecule_image(smiles: str) -> Optional[str]:
         """
         Generate molecular structure image using ModiFinder's draw_molecule function.
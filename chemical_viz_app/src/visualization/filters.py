@@ -145,13 +145,8 @@ class NetworkFilter:
         target_letters: List[str] = ["C", "O", "N"]
     ) -> Tuple[List[ChemicalNode], List[ChemicalEdge]]:
         """Filter nodes that are connected to nodes with library_SMILES containing specified letters."""
-        # Find nodes with library_SMILES containing target letters
-        target_node_ids = set()
-        for node in network.nodes:
-            if "library_SMILES" in node.properties:
-                smiles = str(node.properties["library_SMILES"])
-                if any(letter in smiles for letter in target_letters):
-                    target_node_ids.add(node.id)
+        # Find nodes with library_SMILES containing target letters (cached on the network)
+        target_node_ids = network.get_library_smiles_node_ids(tuple(target_letters))
         
         # Find all nodes connected to target nodes
         connected_node_ids = set(target_node_ids)  # Include the target nodes themselves
@@ -276,6 +276,15 @@ class NetworkVisualizer:
             return tmp.name
     
     def display_in_streamlit(self, html_file: str) -> None:
+        self.display_html(self.build_streamlit_html(html_file))
+    
+    @staticmethod
+    def display_html(html_content: str) -> None:
+        """Render network HTML prepared by build_streamlit_html."""
+        components.html(html_content, height=800, scrolling=True)
+    
+    def build_streamlit_html(self, html_file: str) -> str:
+        """Read a saved pyvis graph, add the click handler, and remove the temporary file."""
         with open(html_file, 'r', encoding='utf-8') as f:
             html_content = f.read()
         
@@ -540,12 +549,11 @@ class NetworkVisualizer:
         else:
             html_content += click_handler_js
         
-        # Display the enhanced HTML
-        components.html(html_content, height=800, scrolling=True)
-        
         # Clean up the temporary file
         if os.path.exists(html_file):
             os.unlink(html_file)
+        
+        return html_content
     
     @staticmethod
     def get_clicked_node_from_url():